@@ -0,0 +1,273 @@
+"""Local stand-in for the parts of the Azkaban AJAX API used by `azkaban.remote.Session` and the builder.
+
+Run `python -m benchmarks.fake_azkaban --port 8081 --latency 0.05 --failure-rate 0.01` to serve it standalone.
+"""
+import json
+import random
+import re
+import socket
+import struct
+import threading
+import time
+import uuid
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MULTIPART_HEAD = 64 * 1024
+
+
+FAILURE_MODES = ('status', 'reset')
+
+
+class FakeAzkaban:
+    """In-memory Azkaban state with injected latency and failures.
+
+    Every request but login sleeps `latency` seconds (plus up to `jitter`) and fails with probability `failure_rate`,
+    either with a 503 response (`failure_mode='status'`) or by resetting the connection (`'reset'`). Handling times
+    are recorded per endpoint in `timings`.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, failure_mode='status', seed=None):
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.projects = dict()
+        self.schedules = dict()
+        self.uploaded_bytes = 0
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.random = random.Random(seed)
+        self.timings = dict()
+        self.failures = 0
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(0, self.jitter) if self.jitter else 0.0
+        if self.latency or jitter:
+            time.sleep(self.latency + jitter)
+
+    def should_fail(self):
+        with self.lock:
+            failed = self.failure_rate > 0 and self.random.random() < self.failure_rate
+            self.failures += failed
+        return failed
+
+    def record(self, endpoint, seconds):
+        with self.lock:
+            self.timings.setdefault(endpoint, []).append(seconds)
+
+    def login(self, params):
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            self.sessions.add(session_id)
+        return {'status': 'success', 'session.id': session_id}
+
+    def fetch_projects(self, params):
+        with self.lock:
+            return {'projects': [{'projectId': project['id'], 'projectName': name}
+                                 for name, project in self.projects.items()]}
+
+    def get_permissions(self, params):
+        with self.lock:
+            project = self.projects.get(params.get('project'))
+        return {'projectId': project['id'], 'permissions': []} if project is not None else None
+
+    def create(self, params):
+        with self.lock:
+            if params['name'] in self.projects:
+                return {'status': 'error', 'message': 'Project already exists.'}
+            self.projects[params['name']] = {'id': len(self.projects) + 1, 'version': 0}
+        return {'status': 'success', 'path': 'manager?project=%s' % params['name'], 'action': 'redirect'}
+
+    def upload(self, params, size):
+        with self.lock:
+            project = self.projects.get(params.get('project'))
+            if project is None:
+                return {'error': 'Installation Failed. Project %s does not exist.' % params.get('project')}
+            project['version'] += 1
+            self.uploaded_bytes += size
+            return {'projectId': str(project['id']), 'version': str(project['version'])}
+
+    def load_flows(self, params):
+        with self.lock:
+            return {'items': [{'scheduleid': schedule['id'], 'projectname': project, 'flowname': flow,
+                               'cronExpression': schedule['cron']}
+                              for (project, flow), schedule in self.schedules.items()]}
+
+    def fetch_schedule(self, params):
+        with self.lock:
+            names = {project['id']: name for name, project in self.projects.items()}
+            schedule = self.schedules.get((names.get(int(params.get('projectId', 0))), params.get('flowId')))
+        if schedule is None:
+            return {}
+        return {'schedule': {'scheduleId': str(schedule['id']), 'cronExpression': schedule['cron']}}
+
+    def schedule_cron(self, params):
+        key = (params['projectName'], params['flow'])
+        with self.lock:
+            if params['projectName'] not in self.projects:
+                return {'status': 'error', 'message': 'Project %s does not exist.' % params['projectName']}
+            existing = self.schedules.get(key)
+            schedule_id = existing['id'] if existing is not None else len(self.schedules) + 1
+            self.schedules[key] = {'id': schedule_id, 'cron': params['cronExpression']}
+        return {'status': 'success', 'message': 'Flow scheduled.', 'scheduleId': schedule_id}
+
+    def remove_schedule(self, params):
+        with self.lock:
+            for key, schedule in list(self.schedules.items()):
+                if str(schedule['id']) == str(params.get('scheduleId')):
+                    del self.schedules[key]
+                    return {'status': 'success', 'message': 'Schedule removed.'}
+        return {'status': 'error', 'message': 'Schedule not found.'}
+
+    def route(self, method, path, params, size=0):
+        """Response body (a dict, `None` for an empty body) of the endpoint at `path`."""
+        ajax, action = params.get('ajax'), params.get('action')
+        if action == 'login':
+            return self.login(params)
+        if path == '/index' and ajax == 'fetchallprojects':
+            return self.fetch_projects(params)
+        if path == '/manager':
+            if ajax == 'getPermissions':
+                return self.get_permissions(params)
+            if action == 'create':
+                return self.create(params)
+            if ajax == 'upload':
+                return self.upload(params, size)
+            return None
+        if path == '/schedule':
+            if ajax == 'loadFlow':
+                return self.load_flows(params)
+            if ajax == 'fetchSchedule':
+                return self.fetch_schedule(params)
+            if ajax == 'scheduleCronFlow':
+                return self.schedule_cron(params)
+            if action == 'removeSched':
+                return self.remove_schedule(params)
+        return {'error': 'Unsupported request %s %s.' % (method, path)}
+
+
+def _multipart_fields(head):
+    fields = dict()
+    for name, value in re.findall(rb'name="([^"]+)"\r\n(?:[^\r\n]+\r\n)*\r\n(.*?)\r\n--', head, re.S):
+        fields[name.decode('utf-8')] = value.decode('utf-8', 'replace')
+    return fields
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server_version = 'FakeAzkaban/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _chunks(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                length = int(self.rfile.readline().split(b';')[0], 16)
+                if not length:
+                    self.rfile.readline()
+                    return
+                yield self.rfile.read(length)
+                self.rfile.readline()
+        remaining = int(self.headers.get('Content-Length') or 0)
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            remaining -= len(chunk)
+            yield chunk
+
+    def _params(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        head, size = b'', 0
+        for chunk in self._chunks():
+            if len(head) < MULTIPART_HEAD:
+                head += chunk[:MULTIPART_HEAD - len(head)]
+            size += len(chunk)
+        if head:
+            if self.headers.get('Content-Type', '').startswith('multipart/form-data'):
+                params.update(_multipart_fields(head))
+            else:
+                params.update({key: values[-1] for key, values in parse_qs(head.decode('utf-8')).items()})
+        return url.path.rstrip('/') or '/', params, size
+
+    def _authorized(self, params):
+        cookie = re.search(r'azkaban\.browser\.session\.id=([0-9a-f]+)', self.headers.get('Cookie', ''))
+        session_id = params.get('session.id') or (cookie.group(1) if cookie else None)
+        return session_id in self.server.azkaban.sessions
+
+    def _respond(self, status, body):
+        content = b'' if body is None else json.dumps(body, separators=(', ', ' : ')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _reset(self):
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        self.close_connection = True
+
+    def _handle(self, method):
+        started = time.perf_counter()
+        azkaban = self.server.azkaban
+        path, params, size = self._params()
+        endpoint = '%s:%s' % (path, params.get('ajax') or params.get('action') or '')
+        try:
+            if params.get('action') == 'login':
+                return self._respond(200, azkaban.route(method, path, params, size))
+            azkaban.delay()
+            if azkaban.should_fail():
+                if azkaban.failure_mode == 'reset':
+                    return self._reset()
+                return self._respond(503, None)
+            if not self._authorized(params):
+                return self._respond(200, {'error': 'session'})
+            self._respond(200, azkaban.route(method, path, params, size))
+        finally:
+            azkaban.record(endpoint, time.perf_counter() - started)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+
+@contextmanager
+def running(azkaban=None, host='127.0.0.1', port=0):
+    """Serve `azkaban` (a fresh `FakeAzkaban` by default) in a background thread, yielding the server."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.azkaban = azkaban if azkaban is not None else FakeAzkaban()
+    server.url = 'http://user:password@%s:%d' % server.server_address[:2]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Serve a local Azkaban stand-in.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Maximum random seconds added on top of latency.')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Probability of a request failing.')
+    parser.add_argument('--failure-mode', choices=FAILURE_MODES, default='status')
+    args = parser.parse_args()
+    stand_in = FakeAzkaban(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                           failure_mode=args.failure_mode)
+    with running(stand_in, host=args.host, port=args.port) as server:
+        print('Serving on %s, press Ctrl+C to stop.' % server.url)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,82 @@
+"""Synthetic project generator: a definition with a random job DAG plus a files directory of scripts and jars."""
+import os
+import random
+from argparse import ArgumentParser
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+SIZES = {
+    'small': {'jobs': 100, 'files': 1000, 'large_files': 2},
+    'medium': {'jobs': 5000, 'files': 20000, 'large_files': 10},
+    'large': {'jobs': 50000, 'files': 200000, 'large_files': 20},
+}
+FILES_PER_DIRECTORY = 500
+
+
+def generate(root, jobs, files, large_files=0, large_size=8 * 1024 * 1024, fan_in=3, window=50, schedules=10,
+             seed=0, name=None):
+    """Write `project.yml` and a `files` directory under `root`, returning their paths.
+
+    Job `i` depends on up to `fan_in` random jobs among the `window` jobs before it, which yields flows of varying
+    depth and fan-out; `files` small scripts and `large_files` jars of `large_size` bytes are created.
+    """
+    rnd = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    files_dir = os.path.join(root, 'files')
+
+    definition_jobs = dict()
+    depended = set()
+    for i in range(jobs):
+        job = {'type': 'command', 'command': 'bash scripts/%d/job_%d.sh' % (i // FILES_PER_DIRECTORY, i)}
+        candidates = range(max(0, i - window), i)
+        dependencies = rnd.sample(candidates, min(len(candidates), rnd.randint(0, fan_in)))
+        if dependencies:
+            job['dependencies'] = ','.join('job_%d' % dependency for dependency in sorted(dependencies))
+            depended.update(dependencies)
+        definition_jobs['job_%d' % i] = job
+    roots = [i for i in range(jobs) if i not in depended]
+
+    definition = {
+        'name': name or 'synthetic-%d-%d' % (jobs, files),
+        'description': 'Synthetic benchmark project.',
+        'properties': {'failure.emails': 'bench@example.com', 'user.to.proxy': 'bench'},
+        'schedule': {'job_%d' % i: '0 0 %d ? * *' % (n % 24) for n, i in enumerate(roots[:schedules])},
+        'jobs': definition_jobs,
+    }
+    definition_path = os.path.join(root, 'project.yml')
+    with open(definition_path, 'w') as f:
+        yaml.dump(definition, f, Dumper=SafeDumper, default_flow_style=False)
+
+    for i in range(files):
+        directory = os.path.join(files_dir, 'scripts', str(i // FILES_PER_DIRECTORY))
+        if i % FILES_PER_DIRECTORY == 0:
+            os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'job_%d.sh' % i), 'w') as f:
+            f.write('#!/usr/bin/env bash\nset -e\necho "job %d"\nsleep %d\n' % (i, rnd.randint(1, 60)))
+    if large_files:
+        os.makedirs(os.path.join(files_dir, 'lib'), exist_ok=True)
+    for i in range(large_files):
+        with open(os.path.join(files_dir, 'lib', 'lib_%d.jar' % i), 'wb') as f:
+            f.write(rnd.randbytes(large_size))
+    return definition_path, files_dir
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Generate a synthetic workflow project.')
+    parser.add_argument('root', help='Output directory.')
+    parser.add_argument('--size', choices=sorted(SIZES), default='small')
+    parser.add_argument('--jobs', type=int, help='Number of jobs (overrides --size).')
+    parser.add_argument('--files', type=int, help='Number of small files (overrides --size).')
+    parser.add_argument('--large-files', type=int, help='Number of large jar files (overrides --size).')
+    parser.add_argument('--fan-in', type=int, default=3, help='Maximum dependencies per job.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    size = dict(SIZES[args.size])
+    size.update({key: value for key, value in (('jobs', args.jobs), ('files', args.files),
+                                               ('large_files', args.large_files)) if value is not None})
+    print(*generate(args.root, fan_in=args.fan_in, seed=args.seed, **size))
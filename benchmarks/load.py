@@ -0,0 +1,103 @@
+"""Load test batch deploys of many synthetic projects against the local Azkaban stand-in."""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from benchmarks.fake_azkaban import FAILURE_MODES, FakeAzkaban, running
+from benchmarks.generate import generate
+from workflow.batch import BatchConfig, run_batch
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def distribution(values):
+    return {'count': len(values), 'p50': percentile(values, 0.5), 'p95': percentile(values, 0.95),
+            'max': max(values) if values else 0.0}
+
+
+def load(root, azkaban, jobs, retries=5, retry_backoff=0.05, timeout=10.0):
+    """Batch deploy every project under `root` to `azkaban`, returning throughput and latency figures.
+
+    Latencies are per deploy phase (as reported by the builder) and per server endpoint, the latter including the
+    injected latency.
+    """
+    with running(azkaban) as server:
+        c = BatchConfig([root, '--azkaban-url', server.url, '--files-to-upload', 'files', '--jobs', str(jobs),
+                         '--retries', str(retries), '--retry-backoff', str(retry_backoff), '--timeout', str(timeout),
+                         '--no-cache'])
+        started = time.perf_counter()
+        results = run_batch(c)
+        elapsed = time.perf_counter() - started
+
+    statuses, phases = dict(), dict()
+    for result in results:
+        statuses[result['status']] = statuses.get(result['status'], 0) + 1
+        if 'report' in result:
+            report = result['report'].as_dict()
+            for phase, seconds in report['phases'].items():
+                phases.setdefault(phase, []).append(seconds)
+            phases.setdefault('total', []).append(report['seconds'])
+    return {
+        'seconds': elapsed,
+        'projects_per_second': len(results) / elapsed if elapsed else 0.0,
+        'statuses': statuses,
+        'injected_failures': azkaban.failures,
+        'uploaded_bytes': azkaban.uploaded_bytes,
+        'phases': {phase: distribution(values) for phase, values in sorted(phases.items())},
+        'endpoints': {endpoint: distribution(values) for endpoint, values in sorted(azkaban.timings.items())},
+    }
+
+
+def show(content):
+    print('%d projects in %.2fs, %.2f projects/s, %s, %d injected failures.' % (
+        sum(content['statuses'].values()), content['seconds'], content['projects_per_second'],
+        ', '.join('%d %s' % (n, status) for status, n in sorted(content['statuses'].items())),
+        content['injected_failures']))
+    for title, section in (('phase', 'phases'), ('endpoint', 'endpoints')):
+        for name, stats in content[section].items():
+            print('%-8s %-28s n %5d  p50 %8.4fs  p95 %8.4fs  max %8.4fs' % (
+                title, name, stats['count'], stats['p50'], stats['p95'], stats['max']))
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Load test batch deploys against a local Azkaban stand-in.')
+    parser.add_argument('--projects', type=int, default=20, help='Number of generated projects.')
+    parser.add_argument('--project-jobs', type=int, default=50, help='Jobs per generated project.')
+    parser.add_argument('--project-files', type=int, default=100, help='Files per generated project.')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help='Batch concurrency.')
+    parser.add_argument('--latency', type=float, default=0.02, help='Seconds added to every server request.')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Maximum random seconds added on top of latency.')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Probability of a server request failing.')
+    parser.add_argument('--failure-mode', choices=FAILURE_MODES, default='status')
+    parser.add_argument('--retries', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='File the JSON results are written to.')
+    args = parser.parse_args()
+    logging.getLogger('workflow').setLevel(logging.ERROR)
+    logging.getLogger('azkaban').setLevel(logging.ERROR)
+
+    workdir = tempfile.mkdtemp(prefix='workflow-load-')
+    try:
+        for i in range(args.projects):
+            generate(os.path.join(workdir, 'project_%d' % i), args.project_jobs, args.project_files,
+                     seed=args.seed + i, name='load-%d' % i)
+        azkaban = FakeAzkaban(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                              failure_mode=args.failure_mode, seed=args.seed)
+        content = load(workdir, azkaban, args.jobs, retries=args.retries)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    content['parameters'] = vars(args)
+    show(content)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(content, f, indent=2, sort_keys=True)
@@ -0,0 +1,115 @@
+"""Benchmark the workflow pipeline stages on a synthetic project and store the results per package version."""
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from benchmarks.fake_azkaban import running
+from benchmarks.generate import SIZES, generate
+from workflow import __version__
+from workflow.archive import SPOOL_MAX_SIZE, write_archive
+from workflow.builder import build_project, process_project
+from workflow.common import yml_read
+from workflow.files import walk_files
+from workflow.session import PooledSession
+
+STAGES = ['yaml_load', 'yaml_load_cached', 'files', 'build_project', 'zip', 'zip_deterministic', 'process_project']
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return {'min': min(timings), 'median': statistics.median(timings), 'runs': timings}
+
+
+def run(root, stages, repeat, workdir):
+    definition_path, files_dir = os.path.join(root, 'project.yml'), os.path.join(root, 'files')
+    cache_dir = os.path.join(workdir, 'cache')
+    definition = yml_read(definition_path)
+    files = list(walk_files(files_dir))
+    name, jobs, properties = definition['name'], definition['jobs'], definition['properties']
+    project = build_project(name, properties, {}, jobs, files, 'bench')
+    yml_read(definition_path, cache_dir=cache_dir)
+
+    def zip_to_disk(deterministic=False):
+        write_archive(project, os.path.join(workdir, 'bench.zip'), deterministic=deterministic)
+
+    benchmarks = {
+        'yaml_load': lambda: yml_read(definition_path),
+        'yaml_load_cached': lambda: yml_read(definition_path, cache_dir=cache_dir),
+        'files': lambda: list(walk_files(files_dir)),
+        'build_project': lambda: build_project(name, properties, {}, jobs, files, 'bench'),
+        'zip': zip_to_disk,
+        'zip_deterministic': lambda: zip_to_disk(deterministic=True),
+    }
+    results = {stage: measure(benchmarks[stage], repeat) for stage in stages if stage in benchmarks}
+
+    if 'process_project' in stages:
+        from azkaban.remote import Session
+
+        with running() as server:
+            session = PooledSession.wrap(Session(url=server.url))
+
+            results['process_project'] = measure(
+                lambda: process_project(session, name, definition, {}, 'bench', files, spool_size=SPOOL_MAX_SIZE),
+                repeat)
+    return results
+
+
+def compare(results, baseline):
+    for stage, result in sorted(results.items()):
+        before = baseline.get('results', {}).get(stage)
+        change = ' %+.1f%%' % (100.0 * (result['min'] / before['min'] - 1)) if before else ''
+        print('%-20s min %9.4fs  median %9.4fs%s' % (stage, result['min'], result['median'], change))
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark workflow on a synthetic project.')
+    parser.add_argument('--size', choices=sorted(SIZES), default='small')
+    parser.add_argument('--jobs', type=int, help='Number of jobs (overrides --size).')
+    parser.add_argument('--files', type=int, help='Number of small files (overrides --size).')
+    parser.add_argument('--large-files', type=int, help='Number of large jar files (overrides --size).')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--project', help='Existing generated project directory to reuse.')
+    parser.add_argument('--output', default=RESULTS_DIR, help='Directory storing results per version.')
+    parser.add_argument('--baseline', help='Result file to compare against.')
+    args = parser.parse_args()
+    logging.getLogger('workflow').setLevel(logging.WARNING)
+    logging.getLogger('azkaban').setLevel(logging.WARNING)
+
+    size = dict(SIZES[args.size])
+    size.update({key: value for key, value in (('jobs', args.jobs), ('files', args.files),
+                                               ('large_files', args.large_files)) if value is not None})
+    workdir = tempfile.mkdtemp(prefix='workflow-bench-')
+    try:
+        root = args.project
+        if root is None:
+            root = os.path.join(workdir, 'project')
+            generate(root, **size)
+        results = run(root, args.stages, args.repeat, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    content = {'version': __version__, 'python': platform.python_version(), 'platform': platform.platform(),
+               'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'parameters': size, 'results': results}
+    label = '%s-%s' % (args.size, '-'.join('%s%d' % (key[0], value) for key, value in sorted(size.items())))
+    path = os.path.join(args.output, __version__, '%s.json' % label)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(content, f, indent=2, sort_keys=True)
+    baseline = dict()
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    compare(results, baseline)
+    print('Results written to %s.' % path)
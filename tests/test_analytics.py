@@ -0,0 +1,67 @@
+import pytest
+
+from workflow.analytics import AnalyzeConfig, FlowAnalytics, fetch_durations
+from workflow.dag import Dag
+
+# extract -> (clean, enrich) -> load, report depends on clean only
+JOBS = {
+    'extract': None,
+    'clean': {'dependencies': 'extract'},
+    'enrich': {'dependencies': 'extract'},
+    'load': {'dependencies': 'clean,enrich'},
+    'report': {'dependencies': 'clean'},
+}
+DURATIONS = {'extract': 10.0, 'clean': 5.0, 'enrich': 20.0, 'load': 1.0, 'report': 3.0}
+
+
+@pytest.fixture
+def analytics():
+    return FlowAnalytics(Dag(JOBS).validate(), DURATIONS)
+
+
+def test_critical_path(analytics):
+    assert analytics.critical_path('load') == (31.0, ['extract', 'enrich', 'load'])
+    assert analytics.critical_path('report') == (18.0, ['extract', 'clean', 'report'])
+    assert analytics.critical_paths() == {'load': 31.0, 'report': 18.0}
+
+
+def test_analyze(analytics):
+    result = analytics.analyze('load', concurrency=2)
+    assert result['jobs'] == 4
+    assert result['work'] == 36.0
+    assert result['width'] == 2
+    assert result['makespan_lower_bound'] == 31.0
+    assert result['makespan'] == 31.0
+
+
+def test_single_executor_runs_everything_in_sequence(analytics):
+    assert analytics.analyze('load', concurrency=1)['makespan'] == 36.0
+
+
+def test_default_duration():
+    analytics = FlowAnalytics(Dag(JOBS).validate(), {'extract': 4.0, 'clean': 2.0})
+    assert analytics.durations == [4.0, 2.0, 3.0, 3.0, 3.0]
+    counted = FlowAnalytics(Dag(JOBS).validate(), {})
+    assert counted.critical_path('load')[0] == 3.0
+    assert FlowAnalytics(Dag(JOBS).validate(), {}, default=2.0).critical_path('load')[0] == 6.0
+
+
+class _Session:
+    def get_workflow_executions(self, name, flow, length=None):
+        return {'executions': [{'execId': 1, 'status': 'SUCCEEDED'}, {'execId': 2, 'status': 'FAILED'},
+                               {'execId': 3, 'status': 'SUCCEEDED'}]}
+
+    def get_execution_status(self, exec_id):
+        if exec_id == 1:
+            raise RuntimeError('unavailable')
+        return {'nodes': [{'id': 'extract', 'status': 'SUCCEEDED', 'startTime': 1000, 'endTime': 5000},
+                          {'id': 'clean', 'status': 'FAILED', 'startTime': 5000, 'endTime': 6000}]}
+
+
+def test_fetch_durations_skips_failing_executions():
+    assert fetch_durations(_Session(), 'p', ['load']) == {'extract': 4.0}
+
+
+def test_concurrency_must_be_positive(tmp_path):
+    with pytest.raises(SystemExit):
+        AnalyzeConfig(['--definition', str(tmp_path / 'project.yml'), '--concurrency', '0'])
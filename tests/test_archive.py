@@ -0,0 +1,45 @@
+import hashlib
+import os
+import zipfile
+
+from workflow.archive import write_archive
+from workflow.builder import build_project
+
+JOBS = {'extract': {'type': 'command', 'command': 'sh extract.sh'},
+        'load': {'type': 'command', 'command': 'sh load.sh', 'dependencies': 'extract'}}
+
+
+def _archive(tmp_path, files, target, deterministic=True):
+    project = build_project('p', {'retries': 1}, {}, JOBS, files, '1')
+    path = str(tmp_path / target)
+    write_archive(project, path, deterministic=deterministic)
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def test_deterministic_archive_is_reproducible(tmp_path):
+    scripts = tmp_path / 'scripts'
+    scripts.mkdir()
+    for name in ('extract.sh', 'load.sh'):
+        (scripts / name).write_text('echo %s\n' % name)
+    files = [(str(scripts / name), name) for name in ('extract.sh', 'load.sh')]
+
+    digest = _archive(tmp_path, files, 'first.zip')
+    for path, _ in files:
+        os.utime(path, (1e9, 1e9))
+    assert _archive(tmp_path, files[::-1], 'second.zip') == digest
+
+    (scripts / 'load.sh').write_text('echo changed\n')
+    assert _archive(tmp_path, files, 'third.zip') != digest
+
+
+def test_deterministic_archive_content(tmp_path):
+    script = tmp_path / 'run.sh'
+    script.write_text('echo run\n')
+    os.chmod(str(script), 0o755)
+    _archive(tmp_path, [(str(script), 'bin/run.sh')], 'project.zip')
+    with zipfile.ZipFile(str(tmp_path / 'project.zip')) as archive:
+        assert archive.namelist() == ['project.properties', 'extract.job', 'load.job', 'bin/run.sh']
+        assert {info.date_time for info in archive.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+        assert archive.getinfo('bin/run.sh').external_attr >> 16 == 0o100755
+        assert archive.read('load.job') == b'command=sh load.sh\ndependencies=extract\ntype=command\n'
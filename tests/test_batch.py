@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from workflow.batch import BatchConfig, run_batch
+
+
+@pytest.fixture
+def definitions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for project, name in (('a', None), ('b', None), ('c', 'c')):
+        (tmp_path / project).mkdir()
+        (tmp_path / project / 'files').mkdir()
+        (tmp_path / project / 'files' / 'run.sh').write_text('echo %s\n' % project)
+        header = 'name: %s\n' % name if name else ''
+        (tmp_path / project / 'project.yml').write_text(header + 'jobs:\n  run:\n    type: noop\n')
+    return tmp_path
+
+
+def _statuses(args):
+    results = run_batch(BatchConfig(args + ['--local', '--no-cache', '--jobs', '2']))
+    return {os.path.basename(os.path.dirname(result['definition'])): result['status'] for result in results}
+
+
+def test_shared_project_names_fail(definitions):
+    assert _statuses([str(definitions)]) == {'a': 'failed', 'b': 'failed', 'c': 'built'}
+
+
+def test_missing_files_fail(definitions):
+    (definitions / 'c' / 'files' / 'run.sh').unlink()
+    (definitions / 'c' / 'files').rmdir()
+    assert _statuses([str(definitions / 'c'), str(definitions / 'a'), '--files-to-upload', 'files']) == {
+        'a': 'built', 'c': 'failed'}
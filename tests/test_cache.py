@@ -0,0 +1,12 @@
+from workflow.cache import archive_hash, content_hash
+
+DEFINITION = {'jobs': {'a': {'type': 'noop'}, 'b': {'type': 'noop', 'dependencies': 'a'}},
+              'schedule': {'b': '0 0 * * *'}}
+
+
+def test_reduce_dependencies_changes_digest():
+    digest = content_hash(DEFINITION, {}, files_digest='0')
+    assert content_hash(DEFINITION, {}, files_digest='0') == digest
+    assert content_hash(DEFINITION, {}, files_digest='0', reduce_dependencies=True) != digest
+    assert archive_hash(DEFINITION, {}, files_digest='0', reduce_dependencies=True) != \
+        archive_hash(DEFINITION, {}, files_digest='0')
@@ -0,0 +1,65 @@
+import os
+
+from workflow import common
+from workflow.common import yml_read
+
+
+def _entries(cache_dir):
+    return [os.path.join(str(cache_dir), name) for name in os.listdir(str(cache_dir))]
+
+
+def test_cache_hit(tmp_path, monkeypatch):
+    definition = tmp_path / 'project.yml'
+    definition.write_text('name: p\njobs:\n  a:\n    type: noop\n')
+    cache_dir = tmp_path / 'cache'
+    assert yml_read(str(definition), cache_dir=str(cache_dir)) == {'name': 'p', 'jobs': {'a': {'type': 'noop'}}}
+    assert os.stat(str(cache_dir)).st_mode & 0o777 == 0o700
+    assert len(_entries(cache_dir)) == 1
+
+    monkeypatch.setattr(common, '_parse', lambda content: 'parsed again')
+    assert yml_read(str(definition), cache_dir=str(cache_dir)) == {'name': 'p', 'jobs': {'a': {'type': 'noop'}}}
+
+
+def test_cache_invalidation(tmp_path):
+    definition = tmp_path / 'project.yml'
+    definition.write_text('name: p\n')
+    cache_dir = str(tmp_path / 'cache')
+    assert yml_read(str(definition), cache_dir=cache_dir) == {'name': 'p'}
+    definition.write_text('name: q\n')
+    assert yml_read(str(definition), cache_dir=cache_dir) == {'name': 'q'}
+    assert yml_read(str(definition), cache_dir=cache_dir) == {'name': 'q'}
+
+
+def test_corrupt_entry_is_ignored(tmp_path):
+    definition = tmp_path / 'project.yml'
+    definition.write_text('name: p\n')
+    cache_dir = tmp_path / 'cache'
+    yml_read(str(definition), cache_dir=str(cache_dir))
+    for entry in _entries(cache_dir):
+        with open(entry, 'wb') as f:
+            f.write(b'\x00garbage')
+    assert yml_read(str(definition), cache_dir=str(cache_dir)) == {'name': 'p'}
+
+
+def test_unsupported_values_are_not_cached(tmp_path):
+    definition = tmp_path / 'project.yml'
+    definition.write_text('released: 2020-01-01\n')
+    cache_dir = tmp_path / 'cache'
+    assert str(yml_read(str(definition), cache_dir=str(cache_dir))['released']) == '2020-01-01'
+    assert not cache_dir.exists() or not _entries(cache_dir)
+
+
+def test_foreign_entries_are_ignored(tmp_path, monkeypatch):
+    definition = tmp_path / 'project.yml'
+    definition.write_text('name: p\n')
+    cache_dir = str(tmp_path / 'cache')
+    yml_read(str(definition), cache_dir=cache_dir)
+    monkeypatch.setattr(common, '_owned', lambda stat: False)
+    monkeypatch.setattr(common, '_parse', lambda content: 'parsed again')
+    assert yml_read(str(definition), cache_dir=cache_dir) == 'parsed again'
+
+
+def test_without_cache(tmp_path):
+    definition = tmp_path / 'empty.yml'
+    definition.write_text('')
+    assert yml_read(str(definition)) == {}
@@ -0,0 +1,31 @@
+from workflow import __main__
+from workflow.config import Config
+
+
+def _project(tmp_path):
+    definition = tmp_path / 'project.yml'
+    definition.write_text('name: p\njobs:\n  run:\n    type: noop\n')
+    files = tmp_path / 'files'
+    files.mkdir()
+    (files / 'run.sh').write_text('echo run\n')
+    return str(definition), str(files)
+
+
+def test_file_collection_and_hashing_are_timed(tmp_path):
+    definition, files = _project(tmp_path)
+    c = Config(['--definition', definition, '--files-to-upload', files, '--local', '--no-cache'])
+    assert [relpath for _, relpath in c.files] == ['run.sh']
+    assert 'files' in c.report.phases and 'hash' not in c.report.phases
+    c.files_digest
+    assert 'hash' in c.report.phases
+
+
+def test_local_deploy_does_not_hash_files(tmp_path, monkeypatch):
+    definition, files = _project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    c = Config(['--definition', definition, '--files-to-upload', files, '--local', '--no-cache',
+                '--state-file', str(tmp_path / 'state.json')])
+    assert __main__.deploy(c) == 0
+    assert c.report.status == 'built'
+    assert 'hash' not in c.report.phases
+    assert (tmp_path / 'p-unversioned.zip').exists()
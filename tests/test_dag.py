@@ -0,0 +1,48 @@
+import pytest
+
+from workflow.dag import Dag, DagError
+
+
+def test_unknown_dependencies():
+    dag = Dag({'a': None, 'b': {'dependencies': 'a, missing'}, 'c': {'dependencies': 'gone'}})
+    assert dag.unknown == [('b', 'missing'), ('c', 'gone')]
+    assert dag.dependencies('b') == ['a']
+    with pytest.raises(DagError) as error:
+        dag.validate()
+    assert error.value.unknown == [('b', 'missing'), ('c', 'gone')]
+    assert error.value.cycle == []
+    assert 'b -> missing' in str(error.value)
+
+
+def test_cycle():
+    dag = Dag({'start': None, 'a': {'dependencies': 'start,c'}, 'b': {'dependencies': 'a'}, 'c': {'dependencies': 'b'}})
+    assert dag.topological() == ['start']
+    assert len(dag.cycle) == 4
+    assert dag.cycle[0] == dag.cycle[-1]
+    assert set(dag.cycle) == {'a', 'b', 'c'}
+    with pytest.raises(DagError) as error:
+        dag.validate()
+    assert error.value.cycle == dag.cycle
+    assert error.value.unknown == []
+
+
+def test_valid():
+    dag = Dag({'a': None, 'b': {'dependencies': 'a'}, 'c': {'dependencies': 'a,b,a'}}).validate()
+    assert dag.topological() == ['a', 'b', 'c']
+    assert dag.edges == 3
+    assert dag.roots == ['c']
+    assert dag.sources == ['a']
+    assert dag.dependents('a') == ['b', 'c']
+
+
+def test_reduced():
+    dag = Dag({
+        'a': None,
+        'b': {'dependencies': 'a'},
+        'c': {'dependencies': 'a,b'},
+        'd': {'dependencies': 'a,b,c'},
+        'e': {'dependencies': 'a'},
+        'f': {'dependencies': 'd,e,a'},
+    }).validate()
+    reduced = {dag.names[i]: [dag.names[parent] for parent in parents] for i, parents in enumerate(dag.reduced())}
+    assert reduced == {'a': [], 'b': ['a'], 'c': ['b'], 'd': ['c'], 'e': ['a'], 'f': ['d', 'e']}
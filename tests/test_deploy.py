@@ -0,0 +1,49 @@
+import pytest
+from azkaban.remote import Session
+
+from benchmarks.fake_azkaban import running
+from workflow.builder import process_project
+from workflow.cache import StateStore
+from workflow.session import PooledSession
+
+DEFINITION = {'jobs': {'extract': {'type': 'noop'}, 'load': {'type': 'noop', 'dependencies': 'extract'}},
+              'schedule': {'load': '0 0 3 ? * *'}}
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with running() as server:
+        yield server
+
+
+def _deploy(server, state, definition=DEFINITION, **kwargs):
+    session = PooledSession.wrap(Session(url=server.url))
+    return process_project(session, 'p', definition, {}, '1', [], state=state, **kwargs).status
+
+
+def test_unchanged_project_is_skipped(server, tmp_path):
+    state = StateStore(str(tmp_path / 'state.json'))
+    assert _deploy(server, state) == 'deployed'
+    assert server.azkaban.projects['p']['version'] == 1
+    assert server.azkaban.schedules[('p', 'load')]['cron'] == '0 0 3 ? * *'
+
+    assert _deploy(server, state) == 'unchanged'
+    assert server.azkaban.projects['p']['version'] == 1
+
+    changed = dict(DEFINITION, jobs=dict(DEFINITION['jobs'], report={'type': 'noop', 'dependencies': 'load'}))
+    assert _deploy(server, state, changed) == 'deployed'
+    assert server.azkaban.projects['p']['version'] == 2
+
+
+def test_force_deploys_unchanged_project(server, tmp_path):
+    state = StateStore(str(tmp_path / 'state.json'))
+    assert _deploy(server, state) == 'deployed'
+    assert _deploy(server, state, force=True) == 'deployed'
+    assert server.azkaban.projects['p']['version'] == 2
+
+
+def test_without_state_every_deploy_uploads(server):
+    assert _deploy(server, None) == 'deployed'
+    assert _deploy(server, None) == 'deployed'
+    assert server.azkaban.projects['p']['version'] == 2
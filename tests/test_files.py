@@ -0,0 +1,39 @@
+from workflow.files import IgnoreRules, walk_files
+
+
+def test_patterns():
+    rules = IgnoreRules(['# comment', '', '*.pyc', 'build/', '/local.yml', 'docs/*.tmp', '!keep.pyc'])
+    assert rules.ignored_path('module.pyc')
+    assert rules.ignored_path('pkg/module.pyc')
+    assert not rules.ignored_path('keep.pyc')
+    assert rules.ignored_path('build/out.zip')
+    assert rules.ignored_path('pkg/build/out.zip')
+    assert not rules.ignored_path('build')
+    assert rules.ignored_path('local.yml')
+    assert not rules.ignored_path('pkg/local.yml')
+    assert rules.ignored_path('docs/draft.tmp')
+    assert not rules.ignored_path('docs/sub/draft.tmp')
+    assert not rules.ignored_path('script.py')
+
+
+def test_escapes():
+    rules = IgnoreRules(['\\#hash', '\\!bang'])
+    assert rules.ignored_path('#hash')
+    assert rules.ignored_path('!bang')
+
+
+def test_from_directory(tmp_path):
+    assert IgnoreRules.from_directory(str(tmp_path)).rules == []
+    (tmp_path / '.workflowignore').write_text('*.log\n')
+    assert IgnoreRules.from_directory(str(tmp_path)).ignored_path('run.log')
+
+
+def test_walk_follows_symlinked_directories_once(tmp_path):
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'data' / 'a.csv').write_text('a')
+    (tmp_path / 'shared').symlink_to(tmp_path / 'data')
+    (tmp_path / 'data' / 'loop').symlink_to(tmp_path)
+    (tmp_path / 'ignored.log').write_text('')
+    (tmp_path / '.workflowignore').write_text('*.log\n')
+    relpaths = sorted(relpath for _, relpath in walk_files(str(tmp_path)))
+    assert relpaths in (['.workflowignore', 'data/a.csv'], ['.workflowignore', 'shared/a.csv'])
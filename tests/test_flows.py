@@ -0,0 +1,48 @@
+import pytest
+
+from workflow.dag import Dag
+from workflow.flows import FlowIndex, FlowsConfig, selection_error, show_flows
+
+JOBS = {
+    'extract': None,
+    'clean': {'dependencies': 'extract'},
+    'report': {'dependencies': 'clean'},
+    'export': {'dependencies': 'clean,extract'},
+    'alone': None,
+}
+
+
+@pytest.fixture
+def index():
+    return FlowIndex(Dag(JOBS).validate())
+
+
+def test_sizes(index):
+    assert index.sizes == {'report': 3, 'export': 3, 'alone': 1}
+
+
+def test_members(index):
+    assert index.members('report') == ['extract', 'clean', 'report']
+    assert index.members('export') == ['extract', 'clean', 'export']
+    assert index.members('alone') == ['alone']
+    with pytest.raises(KeyError):
+        index.members('clean')
+
+
+def test_flows(index):
+    assert index.flows('extract') == ['report', 'export']
+    assert index.flows('report') == ['report']
+    assert index.flows('alone') == ['alone']
+    assert index.orphans == ['alone']
+
+
+def test_selection_error(index):
+    assert selection_error(index.dag, flow='report') is None
+    assert selection_error(index.dag, job='missing') == 'Job missing is not defined.'
+    assert selection_error(index.dag, flow='clean') == 'clean is not a flow, jobs report, export depend on it.'
+
+
+def test_invalid_graph_is_reported(tmp_path):
+    definition = tmp_path / 'project.yml'
+    definition.write_text('jobs:\n  a:\n    dependencies: b\n  b:\n    dependencies: a\n')
+    assert show_flows(FlowsConfig(['--definition', str(definition), '--no-cache'])) == 1
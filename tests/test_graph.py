@@ -0,0 +1,52 @@
+import json
+
+from workflow.dag import Dag
+from workflow.graph import GraphConfig, dot_lines, export_graph, jsonl_lines, neighbourhood
+
+JOBS = {
+    'načti': {'type': 'command'},
+    'clean': {'type': 'command', 'dependencies': 'načti'},
+    'load': {'type': 'noop', 'dependencies': 'clean'},
+}
+
+
+def test_dot():
+    dag = Dag(JOBS).validate()
+    assert ''.join(dot_lines(dag, 'p', JOBS)) == (
+        'digraph "p" {\n'
+        '  rankdir=LR;\n  node [shape=box];\n'
+        '  "načti" [label="načti\\ncommand"];\n'
+        '  "clean" [label="clean\\ncommand"];\n'
+        '  "load" [label="load\\nnoop", peripheries=2];\n'
+        '  "načti" -> "clean";\n'
+        '  "clean" -> "load";\n'
+        '}\n')
+
+
+def test_jsonl():
+    dag = Dag(JOBS).validate()
+    lines = list(jsonl_lines(dag, 'p', JOBS))
+    assert 'načti' in lines[0]
+    assert [json.loads(line) for line in lines] == [
+        {'project': 'p', 'job': 'načti', 'type': 'command', 'dependencies': [], 'root': False},
+        {'project': 'p', 'job': 'clean', 'type': 'command', 'dependencies': ['načti'], 'root': False},
+        {'project': 'p', 'job': 'load', 'type': 'noop', 'dependencies': ['clean'], 'root': True},
+    ]
+
+
+def test_selection():
+    dag = Dag(JOBS).validate()
+    selection = neighbourhood(dag, 'clean', depth=1, direction='down')
+    assert selection == {1, 2}
+    assert [json.loads(line)['dependencies'] for line in jsonl_lines(dag, 'p', JOBS, selection)] == [[], ['clean']]
+    assert neighbourhood(dag, 'load', direction='up') == {0, 1, 2}
+    assert neighbourhood(dag, 'clean', depth=0) == {1}
+
+
+def test_output_file_is_utf8(tmp_path):
+    definition = tmp_path / 'project.yml'
+    definition.write_bytes('name: p\njobs:\n  načti:\n    type: command\n'.encode('utf-8'))
+    output = tmp_path / 'graph.jsonl'
+    c = GraphConfig(['--definition', str(definition), '--format', 'jsonl', '--output', str(output), '--no-cache'])
+    assert export_graph(c) == 0
+    assert json.loads(output.read_bytes().decode('utf-8'))['job'] == 'načti'
@@ -0,0 +1,61 @@
+import json
+import zipfile
+
+from azkaban import Job, Project
+
+from workflow.archive import write_archive
+from workflow.builder import build_project
+from workflow.jobs import CompactJob, JobTable, json_default
+
+JOBS = {
+    'extract': {'type': 'command', 'command': 'sh extract.sh', 'retries': 2},
+    'load': {'type': 'command', 'command': 'sh load.sh', 'dependencies': 'extract',
+             'env': {'TARGET': 'warehouse', 'MODE': 'full'}},
+    'report': {'type': 'command', 'command': 'sh report.sh', 'dependencies': 'load'},
+    'empty': None,
+}
+
+
+def test_table_matches_definition():
+    table = JobTable(JOBS)
+    assert list(table) == list(JOBS)
+    assert {name: dict(record) for name, record in table.items()} == {name: job or {} for name, job in JOBS.items()}
+    assert table['extract'].layout is not table['load'].layout
+    assert table['load']['dependencies'] == 'extract'
+    assert 'load' in table and 'missing' not in table
+
+
+def test_records_share_layouts_and_strings():
+    table = JobTable({'a': {'type': 'command', 'command': 'x' * 50},
+                      'b': {'type': 'command', 'command': 'x' * 50}})
+    assert table['a'].layout is table['b'].layout
+    assert table['a'].values[1] is table['b'].values[1]
+
+
+def test_compact_job_writes_the_same_job_file(tmp_path):
+    table = JobTable(JOBS)
+    for name, job in JOBS.items():
+        expected, actual = tmp_path / ('%s.expected' % name), tmp_path / ('%s.actual' % name)
+        Job(job or {}).build(str(expected))
+        CompactJob(table[name]).build(str(actual))
+        assert actual.read_text() == expected.read_text()
+        assert CompactJob(table[name]).options == Job(job or {}).options
+
+
+def test_json_default():
+    expected = {name: job or {} for name, job in JOBS.items()}
+    assert json.loads(json.dumps(JobTable(JOBS), default=json_default)) == expected
+
+
+def test_archive_matches_azkaban_project(tmp_path):
+    jobs = {name: job for name, job in JOBS.items() if job is not None}
+    expected = Project('p', root=str(tmp_path), version='1')
+    for name, job in jobs.items():
+        expected.add_job(name, Job(job))
+    expected.build(str(tmp_path / 'expected.zip'))
+    write_archive(build_project('p', {}, {}, jobs, [], '1'), str(tmp_path / 'actual.zip'))
+
+    with zipfile.ZipFile(str(tmp_path / 'expected.zip')) as first, \
+            zipfile.ZipFile(str(tmp_path / 'actual.zip')) as second:
+        assert sorted(first.namelist()) == sorted(second.namelist())
+        assert all(first.read(name) == second.read(name) for name in first.namelist())
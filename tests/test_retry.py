@@ -0,0 +1,71 @@
+import pytest
+import requests
+from azkaban.util import AzkabanError
+
+from workflow.retry import RetryPolicy, is_transient
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+@pytest.mark.parametrize('error, transient', [
+    (requests.ConnectionError(), True),
+    (requests.Timeout(), True),
+    (_http_error(503), True),
+    (_http_error(429), True),
+    (_http_error(404), False),
+    (AzkabanError('Azkaban server is unavailable.'), True),
+    (AzkabanError('Unable to connect to Azkaban server %r: %s', 'http://azkaban', 'refused'), True),
+    (AzkabanError('Project %s not found.', 'p'), False),
+    (ValueError('bad'), False),
+])
+def test_is_transient(error, transient):
+    assert is_transient(error) == transient
+
+
+def test_azkaban_error_caused_by_request_error():
+    try:
+        try:
+            raise requests.ReadTimeout()
+        except requests.ReadTimeout as cause:
+            raise AzkabanError('Upload failed.') from cause
+    except AzkabanError as error:
+        assert is_transient(error)
+
+
+def test_retries_transient_failures(monkeypatch):
+    monkeypatch.setattr('time.sleep', lambda seconds: None)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise requests.ConnectionError()
+        return 'ok'
+
+    assert RetryPolicy(attempts=3).call(flaky) == 'ok'
+    assert len(calls) == 3
+
+
+def test_gives_up(monkeypatch):
+    monkeypatch.setattr('time.sleep', lambda seconds: None)
+    calls = []
+
+    def failing(error):
+        calls.append(1)
+        raise error
+
+    with pytest.raises(requests.ConnectionError):
+        RetryPolicy(attempts=2).call(failing, requests.ConnectionError())
+    assert len(calls) == 2
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=5).call(failing, ValueError())
+    assert len(calls) == 3
+
+
+def test_delay_is_capped():
+    policy = RetryPolicy(backoff=1.0, max_backoff=4.0)
+    assert all(0 <= policy.delay(attempt) <= 4.0 for attempt in range(1, 20))
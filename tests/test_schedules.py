@@ -0,0 +1,37 @@
+from azkaban.remote import Session
+
+from benchmarks.fake_azkaban import running
+from workflow.schedules import ScheduleListing, diff_schedules, reconcile_schedules
+from workflow.session import PooledSession
+
+
+def test_diff():
+    current = {
+        'daily': {'scheduleId': 1, 'cronExpression': '0 0 * * *'},
+        'hourly': {'scheduleId': 2, 'cronExpression': '0 * * * *'},
+        'old': {'scheduleId': 3, 'cronExpression': '0 1 * * *'},
+    }
+    desired = {'daily': '0 0 * * *', 'hourly': '30 * * * *', 'new': '0 2 * * *'}
+    add, change, remove = diff_schedules(current, desired)
+    assert add == [('new', '0 2 * * *')]
+    assert change == [('hourly', current['hourly'], '30 * * * *')]
+    assert remove == [('old', current['old'])]
+
+
+def test_unchanged():
+    current = {'daily': {'scheduleId': 1, 'cronExpression': '0 0 * * *'}}
+    assert diff_schedules(current, {'daily': '0 0 * * *'}) == ([], [], [])
+
+
+def test_listing_is_shared_between_projects():
+    with running() as server:
+        for n, name in enumerate(('a', 'b'), start=1):
+            server.azkaban.projects[name] = {'id': n, 'version': 1}
+        server.azkaban.schedules[('b', 'old')] = {'id': 1, 'cron': '0 0 1 ? * *'}
+        session = PooledSession.wrap(Session(url=server.url))
+        listing = ScheduleListing(session)
+        reconcile_schedules(session, 'a', {'daily': '0 0 2 ? * *'}, listing=listing)
+        reconcile_schedules(session, 'b', {'daily': '0 0 3 ? * *'}, prune=True, listing=listing)
+        assert len(server.azkaban.timings['/schedule:loadFlow']) == 1
+        assert {key: schedule['cron'] for key, schedule in server.azkaban.schedules.items()} == {
+            ('a', 'daily'): '0 0 2 ? * *', ('b', 'daily'): '0 0 3 ? * *'}
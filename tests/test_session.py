@@ -0,0 +1,22 @@
+import pytest
+import requests
+from azkaban.remote import Session
+
+from benchmarks.fake_azkaban import FakeAzkaban, running
+from workflow.session import PooledSession
+
+
+def test_login_and_session_check():
+    with running() as server:
+        session = PooledSession.wrap(Session(url=server.url))
+        assert not session.is_valid()
+        session._refresh()
+        assert session.is_valid()
+
+
+def test_session_check_times_out():
+    with running(FakeAzkaban(latency=1.0)) as server:
+        session = PooledSession.wrap(Session(url=server.url), timeout=0.2)
+        session._refresh()
+        with pytest.raises(requests.Timeout):
+            session.is_valid()
@@ -0,0 +1,34 @@
+import pytest
+
+from workflow.templates import ExpandedJobs, TemplateError, definition_jobs
+
+
+def test_expansion():
+    jobs = ExpandedJobs({'start': {'type': 'noop'}}, {
+        'load': {
+            'name': 'load_{table}_{region}',
+            'matrix': {'table': ['users', 'orders'], 'region': ['eu', 'us']},
+            'exclude': [{'table': 'orders', 'region': 'us'}],
+            'job': {'type': 'command', 'command': 'load {table} --region {region}', 'dependencies': 'start'},
+        },
+        'done': {'name': 'done', 'job': {'type': 'noop', 'dependencies': 'load_*'}},
+    })
+    assert list(jobs) == ['start', 'load_users_eu', 'load_users_us', 'load_orders_eu', 'done']
+    assert 'load_orders_us' not in jobs
+    assert jobs['load_users_us'] == {'type': 'command', 'command': 'load users --region us', 'dependencies': 'start'}
+    assert jobs['done']['dependencies'] == 'load_users_eu,load_users_us,load_orders_eu'
+
+
+def test_unmatched_wildcard_is_kept():
+    jobs = ExpandedJobs({'a': {'dependencies': 'missing_*'}}, {})
+    assert jobs['a']['dependencies'] == 'missing_*'
+
+
+def test_duplicate_name():
+    with pytest.raises(TemplateError):
+        ExpandedJobs({'load_a': None}, {'load': {'name': 'load_{x}', 'matrix': {'x': ['a']}, 'job': {}}})
+
+
+def test_definition_without_templates():
+    jobs = {'a': {'type': 'noop'}}
+    assert definition_jobs({'jobs': jobs}) is jobs
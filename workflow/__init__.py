@@ -1,8 +1,12 @@
 import logging
 
-from workflow._version import get_versions
+logger = logging.getLogger(__name__)
 
-__version__ = get_versions()['version']
-del get_versions
 
-logger = logging.getLogger(__name__)
+def __getattr__(name):
+    if name == '__version__':
+        from workflow._version import get_versions
+
+        globals()['__version__'] = get_versions()['version']
+        return globals()['__version__']
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
@@ -1,15 +1,95 @@
+import sys
+from importlib.resources import files
 from logging.config import dictConfig
 
 import yaml
-from pkg_resources import resource_stream
 
-from workflow import logger, __version__
+from workflow import logger
 from workflow.builder import process_project
-from workflow.config import Config
+from workflow.config import Config, DefinitionConfig
 
-dictConfig(yaml.load(resource_stream(__name__, 'log.yml')))
 
-if __name__ == '__main__':
-    c = Config()
+def configure_logging(stream=None):
+    config = yaml.safe_load(files('workflow').joinpath('log.yml').read_text())
+    if stream is not None:
+        config['handlers']['console']['stream'] = stream
+    dictConfig(config)
+    from workflow import __version__
+
     logger.info('Azkaban Workflow Builder and Uploader version %s.' % __version__)
-    process_project(c.get_session(), c.name, c.definition, c.extra_properties, c.version, c.files)
+
+
+def deploy(c):
+    session = c.get_session()
+    state = c.state
+    # the files digest is only compared against the deploy state, which is not checked for local builds
+    files_digest = c.files_digest if session is not None and state is not None else None
+    report = process_project(session, c.name, c.definition, c.extra_properties, c.version, c.files,
+                             spool_size=c.spool_size, state=state, force=c.force,
+                             deterministic=c.deterministic, schedule_concurrency=c.schedule_concurrency,
+                             prune_schedules=c.prune_schedules, reduce_dependencies=c.reduce_dependencies,
+                             files_digest=files_digest, report=c.report)
+    logger.info('Deploy of %s', report.summary())
+    if c.parsed.report is not None:
+        report.write(c.parsed.report)
+    return 0
+
+
+def batch(c):
+    from workflow.batch import run_batch
+
+    results = run_batch(c)
+    return 1 if any(result['status'] == 'failed' for result in results) else 0
+
+
+def flows(c):
+    from workflow.flows import show_flows
+
+    return show_flows(c)
+
+
+def analyze(c):
+    from workflow.analytics import analyze
+
+    return analyze(c)
+
+
+def graph(c):
+    from workflow.graph import export_graph
+
+    return export_graph(c)
+
+
+def command_config(argv):
+    """Config and function of the subcommand in `argv`, deploying a single definition by default."""
+    if argv[:1] == ['batch']:
+        from workflow.batch import BatchConfig
+
+        return BatchConfig(argv[1:]), batch
+    if argv[:1] == ['flows']:
+        from workflow.flows import FlowsConfig
+
+        return FlowsConfig(argv[1:]), flows
+    if argv[:1] == ['analyze']:
+        from workflow.analytics import AnalyzeConfig
+
+        return AnalyzeConfig(argv[1:]), analyze
+    if argv[:1] == ['graph']:
+        from workflow.graph import GraphConfig
+
+        return GraphConfig(argv[1:]), graph
+    return Config(argv), deploy
+
+
+if __name__ == '__main__':
+    c, command = command_config(sys.argv[1:])
+    # Commands printing results keep stdout for them.
+    configure_logging('ext://sys.stderr' if isinstance(c, DefinitionConfig) else None)
+    if c.parsed.profile is not None or c.parsed.trace_memory:
+        from workflow.profiling import profiled
+
+        with profiled(c.parsed.profile, memory=c.parsed.trace_memory):
+            status = command(c)
+    else:
+        status = command(c)
+    sys.exit(status)
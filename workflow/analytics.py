@@ -0,0 +1,205 @@
+import heapq
+import json
+import os
+import statistics
+import sys
+
+from workflow import logger
+from workflow.cache import StateStore
+from workflow.common import DEFAULT_CACHE_DIR
+from workflow.config import DefinitionConfig, positive_int
+from workflow.dag import DagError
+from workflow.flows import FlowIndex, selection_error
+from workflow.retry import retrying
+
+DEFAULT_DURATIONS = os.path.join(DEFAULT_CACHE_DIR, 'durations.json')
+DEFAULT_EXECUTIONS = 10
+
+
+def fetch_durations(session, name, flows, executions=DEFAULT_EXECUTIONS):
+    """Median duration in seconds of every job which succeeded in the last `executions` executions of `flows`."""
+    samples = dict()
+    for flow in flows:
+        try:
+            listing = retrying(session, session.get_workflow_executions, name, flow, length=executions)
+        except Exception as e:
+            logger.warning('Unable to fetch executions of %s/%s (%s).', name, flow, e)
+            continue
+        for execution in listing.get('executions', []):
+            if execution.get('status') != 'SUCCEEDED':
+                continue
+            try:
+                status = retrying(session, session.get_execution_status, execution['execId'])
+            except Exception as e:
+                logger.warning('Unable to fetch execution %s of %s/%s (%s).', execution['execId'], name, flow, e)
+                continue
+            stack = list(status.get('nodes', []))
+            while stack:
+                node = stack.pop()
+                stack.extend(node.get('nodes', []))
+                if node.get('status') == 'SUCCEEDED' and node.get('endTime', 0) > node.get('startTime', 0) > 0:
+                    samples.setdefault(node['id'], []).append((node['endTime'] - node['startTime']) / 1000.0)
+    return {job: statistics.median(values) for job, values in samples.items()}
+
+
+class FlowAnalytics:
+    """Critical paths, parallelism and makespans of the flows of a `Dag`, weighted by job durations in seconds.
+
+    Jobs without a known duration take `default`, by default the median of the known ones (or 1, counting jobs).
+    """
+
+    def __init__(self, dag, durations, default=None):
+        self.dag = dag
+        self.index = FlowIndex(dag)
+        known = [durations[name] for name in dag.names if name in durations]
+        if default is None:
+            default = statistics.median(known) if known else 1.0
+        self.durations = [durations.get(name, default) for name in dag.names]
+        # Earliest finish of every job with unlimited executors; it only depends on the ancestors, so it is the same
+        # in every flow containing the job.
+        self.finish = [0.0] * len(dag)
+        self.previous = [None] * len(dag)
+        self.position = [0] * len(dag)
+        for position, i in enumerate(dag.order):
+            self.position[i] = position
+            start = 0.0
+            for parent in dag.parents[i]:
+                if self.finish[parent] > start:
+                    start, self.previous[i] = self.finish[parent], parent
+            self.finish[i] = start + self.durations[i]
+
+    def critical_path(self, flow):
+        """Length in seconds and jobs (first to last) of the longest chain of dependencies of `flow`."""
+        i = self.dag.index[flow]
+        path = []
+        while i is not None:
+            path.append(self.dag.names[i])
+            i = self.previous[i]
+        return self.finish[self.dag.index[flow]], path[::-1]
+
+    def critical_paths(self):
+        return {self.dag.names[root]: self.finish[root] for root in self.index.roots}
+
+    def width(self, members):
+        """Peak number of jobs running at once when every job starts as soon as its dependencies finish."""
+        events = []
+        for i in members:
+            events.append((self.finish[i] - self.durations[i], 1))
+            events.append((self.finish[i], -1))
+        peak = running = 0
+        for _, change in sorted(events, key=lambda event: (event[0], event[1])):
+            running += change
+            peak = max(peak, running)
+        return peak
+
+    def makespan(self, members, concurrency):
+        """Makespan of a list schedule of `members` on `concurrency` executors, longest remaining path first."""
+        inside = set(members)
+        remaining = dict()
+        for i in sorted(members, key=self.position.__getitem__, reverse=True):
+            children = [child for child in self.dag.children[i] if child in inside]
+            remaining[i] = self.durations[i] + max((remaining[child] for child in children), default=0.0)
+        pending = {i: len(self.dag.parents[i]) for i in members}
+        ready = [(-remaining[i], i) for i in members if not pending[i]]
+        heapq.heapify(ready)
+        running = []
+        now = 0.0
+        while ready or running:
+            while ready and len(running) < concurrency:
+                _, i = heapq.heappop(ready)
+                heapq.heappush(running, (now + self.durations[i], i))
+            now, i = heapq.heappop(running)
+            for child in self.dag.children[i]:
+                if child in inside:
+                    pending[child] -= 1
+                    if not pending[child]:
+                        heapq.heappush(ready, (-remaining[child], child))
+        return now
+
+    def analyze(self, flow, concurrency):
+        members = [self.dag.index[name] for name in self.index.members(flow)]
+        length, path = self.critical_path(flow)
+        work = sum(self.durations[i] for i in members)
+        return {
+            'flow': flow,
+            'jobs': len(members),
+            'work': work,
+            'critical_path': length,
+            'critical_jobs': path,
+            'width': self.width(members),
+            'concurrency': concurrency,
+            'makespan_lower_bound': max(length, work / concurrency),
+            'makespan': self.makespan(members, concurrency),
+        }
+
+
+class AnalyzeConfig(DefinitionConfig):
+    command = 'analyze'
+    description = 'Critical path, parallelism and makespan of the flows of a definition.'
+
+    @staticmethod
+    def _add_command_arguments(parser):
+        parser.add_argument('--durations', default=DEFAULT_DURATIONS,
+                            help='File caching job durations per project (default %s).' % DEFAULT_DURATIONS)
+        parser.add_argument('--default-duration', type=float,
+                            help='Seconds assumed for jobs without history (default: median of known durations).')
+        parser.add_argument('--concurrency', '-c', type=positive_int, default=10,
+                            help='Number of jobs an executor runs at once (default 10).')
+        parser.add_argument('--flow', action='append', help='Analyze this flow; can be repeated.')
+        parser.add_argument('--top', type=int, default=10,
+                            help='Without --flow, analyze this many flows with the longest critical paths.')
+        parser.add_argument('--json', action='store_true', help='Write JSON lines instead of a table.')
+        fetch = parser.add_mutually_exclusive_group()
+        fetch.add_argument('--azkaban-alias', '-a',
+                           help='Refresh durations from the execution history of this azkaban alias.')
+        fetch.add_argument('--azkaban-url', '-u', help='Refresh durations from the execution history at this url.')
+        parser.add_argument('--executions', type=int, default=DEFAULT_EXECUTIONS,
+                            help='Number of past executions per flow used to refresh durations (default %d).'
+                                 % DEFAULT_EXECUTIONS)
+        DefinitionConfig._add_session_arguments(parser)
+
+    def get_session(self, pool_size=1):
+        if self.parsed.azkaban_alias is not None or self.parsed.azkaban_url is not None:
+            return self._session(pool_size)
+
+
+def analyze(c, out=sys.stdout):
+    try:
+        dag = c.dag
+    except DagError as e:
+        logger.error('%s', e)
+        return 1
+    flows = c.parsed.flow
+    for flow in flows or []:
+        error = selection_error(dag, flow=flow)
+        if error is not None:
+            logger.error('%s', error)
+            return 1
+
+    store = StateStore(c.parsed.durations)
+    durations = store.get(c.name) or dict()
+    session = c.get_session()
+    if session is not None:
+        fetched = flows or [dag.names[i] for i, children in enumerate(dag.children) if not children]
+        durations.update(fetch_durations(session, c.name, fetched, executions=c.parsed.executions))
+        store.set(c.name, durations)
+        logger.info('Cached durations of %d jobs of %s in %s.', len(durations), c.name, c.parsed.durations)
+
+    analytics = FlowAnalytics(dag, durations, default=c.parsed.default_duration)
+    if not flows:
+        lengths = analytics.critical_paths()
+        flows = sorted(lengths, key=lambda flow: (-lengths[flow], flow))[:c.parsed.top]
+
+    if not c.parsed.json:
+        out.write('%-40s %7s %12s %12s %6s %12s %12s\n' % (
+            'flow', 'jobs', 'work', 'critical', 'width', 'lower bound', 'makespan'))
+    for flow in flows:
+        result = analytics.analyze(flow, c.parsed.concurrency)
+        if c.parsed.json:
+            out.write(json.dumps(result) + '\n')
+        else:
+            out.write('%-40s %7d %11.0fs %11.0fs %6d %11.0fs %11.0fs\n' % (
+                flow, result['jobs'], result['work'], result['critical_path'], result['width'],
+                result['makespan_lower_bound'], result['makespan']))
+            out.write('    critical path: %s\n' % ' -> '.join(result['critical_jobs']))
+    return 0
@@ -0,0 +1,65 @@
+import os
+import shutil
+from tempfile import SpooledTemporaryFile
+from zipfile import ZipFile, ZipInfo
+
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def _properties(options):
+    return ''.join('%s=%s\n' % item for item in sorted(options.items()))
+
+
+def _fixed_info(archive_path, mode):
+    info = ZipInfo(archive_path, date_time=FIXED_DATE_TIME)
+    info.create_system = 3
+    info.external_attr = mode << 16
+    return info
+
+
+def _write_fixed(writer, path, archive_path):
+    if os.path.isdir(path):
+        writer.writestr(_fixed_info(archive_path.rstrip('/') + '/', 0o40755), b'')
+        return
+    stat = os.stat(path)
+    info = _fixed_info(archive_path, 0o100755 if stat.st_mode & 0o111 else 0o100644)
+    # zipfile needs the size up front to write zip64 headers for members over 2 GiB
+    info.file_size = stat.st_size
+    with open(path, 'rb') as source, writer.open(info, 'w') as target:
+        shutil.copyfileobj(source, target)
+
+
+def write_archive(project, target, deterministic=False):
+    from azkaban.util import AzkabanError, flatten
+
+    if not (project.jobs or project.files):
+        raise AzkabanError('Building empty project.')
+    with ZipFile(target, 'w') as writer:
+        if not deterministic:
+            if project.properties:
+                writer.writestr('project.properties', _properties(flatten(project.properties)))
+            for name, job in project.jobs.items():
+                writer.writestr('%s.job' % name, _properties(job.options))
+            for path, archive_path in project.files:
+                writer.write(path, archive_path)
+            return
+
+        if project.properties:
+            writer.writestr(_fixed_info('project.properties', 0o100644), _properties(flatten(project.properties)))
+        jobs = project.jobs
+        for name in sorted(jobs):
+            writer.writestr(_fixed_info('%s.job' % name, 0o100644), _properties(jobs[name].options))
+        for path, archive_path in sorted(project.files, key=lambda x: x[1]):
+            _write_fixed(writer, path, archive_path)
+
+
+def spool_archive(project, max_size=SPOOL_MAX_SIZE, deterministic=False):
+    archive = SpooledTemporaryFile(max_size=max_size)
+    try:
+        write_archive(project, archive, deterministic=deterministic)
+    except Exception:
+        archive.close()
+        raise
+    archive.seek(0)
+    return archive
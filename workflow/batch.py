@@ -0,0 +1,224 @@
+import os
+import shutil
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from glob import glob
+from tempfile import mkdtemp
+
+from workflow import logger
+from workflow.archive import write_archive
+from workflow.builder import ProjectListing, build_project, check_unchanged, upload_project
+from workflow.changes import LAST_DEPLOY, affected_definitions, record_deploy
+from workflow.config import Config
+from workflow.metrics import write_report
+from workflow.schedules import ScheduleListing, reconcile_schedules
+
+DEFAULT_PATTERN = 'project.yml'
+
+
+class BatchConfig(Config):
+    @property
+    def _parser(self):
+        parser = ArgumentParser(prog='python -m workflow batch',
+                                description='Build and upload many workflow definitions in one process.')
+
+        parser.add_argument('definitions', nargs='+',
+                            help='Definition files, glob patterns or directories searched recursively for --pattern.')
+        parser.add_argument('--pattern', '-p', default=DEFAULT_PATTERN,
+                            help='File name pattern of definitions inside directories (default %s).' % DEFAULT_PATTERN)
+        parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                            help='Number of projects built and uploaded concurrently.')
+        parser.add_argument('--projects-ttl', type=int, default=300,
+                            help='Seconds the server project and schedule listings are reused between uploads '
+                                 '(default 300).')
+        parser.add_argument('--changed-since', metavar='REVISION',
+                            help='Only process definitions whose definition, extra properties or files changed since '
+                                 "the git REVISION; '%s' uses the revision of the last successful batch deploy "
+                                 'recorded in --state-file.' % LAST_DEPLOY)
+        # archives are built by worker processes and handed to the uploaders as files, so they are never streamed
+        self._add_arguments(parser, stream=False)
+        return parser
+
+    @property
+    def definitions(self):
+        found = []
+        for candidate in self.parsed.definitions:
+            if os.path.isdir(candidate):
+                found.extend(glob(os.path.join(candidate, '**', self.parsed.pattern), recursive=True))
+            elif os.path.isfile(candidate):
+                found.append(candidate)
+            else:
+                found.extend(glob(candidate, recursive=True))
+        return sorted(set(os.path.abspath(path) for path in found))
+
+    @staticmethod
+    def _resolve(definition, option, path):
+        for candidate in (os.path.join(os.path.dirname(definition), path), path):
+            if os.path.exists(candidate):
+                return candidate
+        raise FileNotFoundError('%s %s of %s exists neither next to it nor in the current directory.'
+                                % (option, path, definition))
+
+    def project_args(self, definition):
+        """Arguments of a local single-project `Config` for `definition`.
+
+        Relative extra properties and files paths are resolved against the directory of each definition first, then
+        against the current directory; `FileNotFoundError` is raised when neither exists.
+        """
+        args = ['--definition', definition, '--local', '--version-mode', self.parsed.version_mode,
+                '--cache-dir', self.parsed.cache_dir]
+        for option, value in (('--extra-properties', self.parsed.extra_properties),
+                              ('--files-to-upload', self.parsed.files_to_upload)):
+            if value is not None:
+                args += [option, self._resolve(definition, option, value)]
+        for option, value in (('--files-from-git', self.parsed.files_from_git), ('--version', self.parsed.version)):
+            if value is not None:
+                args += [option, value]
+        for option, value in (('--deterministic', self.parsed.deterministic), ('--no-cache', self.parsed.no_cache),
+                              ('--reduce-dependencies', self.parsed.reduce_dependencies)):
+            if value:
+                args.append(option)
+        return args
+
+    def project_inputs(self, definition):
+        return Config(self.project_args(definition)).inputs
+
+    def shared_names(self, definitions):
+        """Project names used by more than one of `definitions`, with the definitions using them.
+
+        Such definitions would be uploaded into the same Azkaban project concurrently and share one deploy state key.
+        """
+        users = dict()
+        for definition in definitions:
+            users.setdefault(Config(self.project_args(definition)).name, []).append(definition)
+        return {name: shared for name, shared in users.items() if len(shared) > 1}
+
+
+def _build(args, url, state, force, workdir):
+    c = Config(args)
+    report = c.report
+    report.name, report.version = c.name, c.version
+    result = {'definition': c.parsed.definition, 'name': c.name, 'version': c.version, 'report': report}
+    definition = c.definition
+    files = c.files
+    report.count('files', len(files))
+    if url is not None and state is not None:
+        files_digest = c.files_digest
+        with report.phase('hash'):
+            result['key'], result['digest'], unchanged = check_unchanged(state, c.name, url, definition,
+                                                                         c.extra_properties, files, force=force,
+                                                                         files_digest=files_digest,
+                                                                         reduce_dependencies=c.reduce_dependencies)
+        if unchanged:
+            result['status'] = 'unchanged'
+            report.finish('unchanged')
+            return result
+
+    with report.phase('build'):
+        project = build_project(c.name, definition.get('properties', dict()), c.extra_properties, c.jobs, files,
+                                c.version, reduce_dependencies=c.reduce_dependencies, report=report)
+    directory = mkdtemp(dir=workdir) if workdir is not None else os.curdir
+    result['path'] = os.path.join(directory, '%s.zip' % project.versioned_name)
+    with report.phase('archive'):
+        write_archive(project, result['path'], deterministic=c.deterministic)
+    report.count('archive_bytes', os.path.getsize(result['path']))
+    result.update(description=definition.get('description', c.name), schedules=definition.get('schedule', dict()))
+    result['status'] = 'built'
+    report.finish('built')
+    return result
+
+
+def _deploy(c, session, projects, schedules, state, result):
+    report = result['report']
+    try:
+        with report.phase('upload'):
+            upload_project(session, result['name'], result['path'], result['version'], result['description'],
+                           projects=projects)
+        with report.phase('schedule'):
+            reconcile_schedules(session, result['name'], result['schedules'], concurrency=c.schedule_concurrency,
+                                prune=c.prune_schedules, listing=schedules)
+    finally:
+        os.remove(result['path'])
+    if state is not None:
+        state.set(result['key'], result['digest'])
+    result['status'] = 'deployed'
+    report.finish('deployed')
+    return result
+
+
+def run_batch(c):
+    session = c.get_session(pool_size=c.parsed.jobs)
+    state = c.state
+    url = session.url if session is not None else None
+    projects = schedules = None
+    if session is not None:
+        projects = ProjectListing(session, ttl=c.parsed.projects_ttl)
+        schedules = ScheduleListing(session, ttl=c.parsed.projects_ttl)
+
+    results = []
+    definitions = []
+    for definition in c.definitions:
+        try:
+            c.project_args(definition)
+        except FileNotFoundError as e:
+            logger.error('%s', e)
+            results.append({'definition': definition, 'status': 'failed', 'error': str(e)})
+            continue
+        definitions.append(definition)
+    if c.parsed.changed_since is not None:
+        inputs = {definition: c.project_inputs(definition) for definition in definitions}
+        definitions = affected_definitions(inputs, c.parsed.changed_since, state=state, url=url)
+    for name, shared in c.shared_names(definitions).items():
+        error = 'Project name %s is used by %d definitions (%s); give them distinct names.' % (
+            name, len(shared), ', '.join(shared))
+        logger.error('%s', error)
+        results.extend({'definition': definition, 'status': 'failed', 'error': error} for definition in shared)
+    failed = {result['definition'] for result in results}
+    definitions = [definition for definition in definitions if definition not in failed]
+    logger.info('Processing %d definitions with %d jobs.', len(definitions), c.parsed.jobs)
+    workdir = mkdtemp(prefix='workflow-batch-') if session is not None else None
+    try:
+        with ProcessPoolExecutor(max_workers=c.parsed.jobs) as builders, \
+                ThreadPoolExecutor(max_workers=c.parsed.jobs) as uploaders:
+            builds = {builders.submit(_build, c.project_args(definition), url, state, c.force, workdir): definition
+                      for definition in definitions}
+            deploys = dict()
+            for future in as_completed(builds):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    results.append({'definition': builds[future], 'status': 'failed', 'error': repr(e)})
+                    continue
+                if session is None or result['status'] == 'unchanged':
+                    results.append(result)
+                else:
+                    deploys[uploaders.submit(_deploy, c, session, projects, schedules, state, result)] = result
+            for future in as_completed(deploys):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    deploys[future].update(status='failed', error=repr(e))
+                    results.append(deploys[future])
+    finally:
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    results.sort(key=lambda result: result['definition'])
+
+    entries = []
+    for result in results:
+        entry = {'definition': result['definition'], 'status': result['status'], 'error': result.get('error')}
+        if 'report' in result:
+            entry.update(result['report'].as_dict(), status=result['status'])
+            logger.info('%s', result['report'].summary())
+        if 'error' in result:
+            logger.info('failed %s (%s)', result.get('name', result['definition']), result['error'])
+        entries.append(entry)
+    if c.parsed.report is not None:
+        write_report(c.parsed.report, entries)
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    if session is not None and state is not None and 'failed' not in summary:
+        record_deploy(state, c.definitions, url)
+    logger.info('Batch finished: %s.', ', '.join('%d %s' % (n, status) for status, n in sorted(summary.items())))
+    return results
@@ -1,57 +1,165 @@
 import os
-
-from azkaban import Job
-from azkaban import Project
-from azkaban.util import AzkabanError
+import threading
+import time
+import uuid
 
 from workflow import logger
+from workflow.archive import spool_archive, write_archive
+from workflow.cache import content_hash
 from workflow.common import DIRTY_POSTFIX
+from workflow.dag import Dag
+from workflow.jobs import CompactJob, JobTable
+from workflow.metrics import Report
+from workflow.retry import retrying
+from workflow.schedules import DEFAULT_CONCURRENCY, reconcile_schedules
+from workflow.templates import definition_jobs
 
 
-def upload_project(session, name, zipfile, version, description):
-    existing = {project['projectName'] for project in session.get_projects()['projects']}
-    if name not in existing:
-        logger.info("Project %s doesn't exist. Creating.", name)
-        session.create_project(name, description=description)
+class ProjectListing:
+    """Names of all projects on the server, shared between uploads and refetched after `ttl` seconds."""
 
-    if version.endswith(DIRTY_POSTFIX):
-        logger.warning('Uploading uncommitted version of workflow.')
+    def __init__(self, session, ttl=300):
+        self.session = session
+        self.ttl = ttl
+        self._names = None
+        self._fetched = None
+        self._lock = threading.Lock()
 
-    logger.info('Uploading file %s to project %s.', zipfile, name)
-    session.upload_project(name, zipfile)
+    def __contains__(self, name):
+        with self._lock:
+            if self._names is None or time.monotonic() - self._fetched > self.ttl:
+                listing = retrying(self.session, self.session.get_projects)
+                self._names = {project['projectName'] for project in listing['projects']}
+                self._fetched = time.monotonic()
+            return name in self._names
 
+    def add(self, name):
+        with self._lock:
+            if self._names is not None:
+                self._names.add(name)
+
+
+def project_exists(session, name):
+    from azkaban.util import AzkabanError
 
-def schedule_flow(session, name, flow, schedule):
     try:
-        current = session.get_schedule(name, flow)
+        retrying(session, session._get_project_id, name)
     except AzkabanError:
-        current = None
-    if current is None:
-        logger.info('Scheduling %s@%s to %s', flow, name, schedule)
-        session.schedule_cron_workflow(name, flow, schedule)
-    elif current['cronExpression'] != schedule:
-        logger.info('Rescheduling %s @ %s from %s to %s.', flow, name, current['cronExpression'], schedule)
-        session.unschedule_workflow(name, flow)
-        session.schedule_cron_workflow(name, flow, schedule)
+        return False
+    return True
+
+
+def _prepare_upload(session, name, version, description, projects=None):
+    exists = name in projects if projects is not None else project_exists(session, name)
+    if not exists:
+        logger.info("Project %s doesn't exist. Creating.", name)
+        from azkaban.util import AzkabanError
 
+        try:
+            retrying(session, session.create_project, name, description=description)
+        except AzkabanError:
+            # an attempt which timed out may still have created the project
+            if not project_exists(session, name):
+                raise
+        if projects is not None:
+            projects.add(name)
+
+    if version.endswith(DIRTY_POSTFIX):
+        logger.warning('Uploading uncommitted version of workflow.')
+
+
+def upload_project(session, name, zipfile, version, description, projects=None):
+    _prepare_upload(session, name, version, description, projects=projects)
+    logger.info('Uploading file %s to project %s.', zipfile, name)
+    retrying(session, session.upload_project, name, zipfile)
+
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _upload_form(archive, archive_name, params, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Headers and streamed body of a multipart upload form, reading `archive` from its start chunk by chunk."""
+    boundary = uuid.uuid4().hex
+    head = ''.join('--%s\r\nContent-Disposition: form-data; name="%s"\r\n\r\n%s\r\n' % (boundary, key, value)
+                   for key, value in params.items())
+    head += ('--%s\r\nContent-Disposition: form-data; name="file"; filename="%s"\r\n'
+             'Content-Type: application/zip\r\n\r\n' % (boundary, archive_name))
+
+    def body():
+        yield head.encode('utf-8')
+        archive.seek(0)
+        for chunk in iter(lambda: archive.read(chunk_size), b''):
+            yield chunk
+        yield ('\r\n--%s--\r\n' % boundary).encode('utf-8')
+
+    return {'Content-Type': 'multipart/form-data; boundary=%s' % boundary}, body()
+
+
+def upload_stream(session, name, archive, archive_name, version, description):
+    _prepare_upload(session, name, version, description)
+    logger.info('Uploading streamed archive %s to project %s.', archive_name, name)
+    from azkaban.remote import _extract_json
+
+    # Session.upload_project only accepts a path, so the upload form is posted directly; the session is validated
+    # first because a streamed body cannot be sent twice.
+    def post():
+        if not session.is_valid():
+            session._refresh()
+        archive.seek(0)
+        headers, body = _upload_form(archive, archive_name,
+                                     {'ajax': 'upload', 'project': name, 'session.id': session.id})
+        return _extract_json(session._request(
+            method='POST',
+            endpoint='manager',
+            include_session=False,
+            headers=headers,
+            data=body,
+        ))
+
+    return retrying(session, post)
+
+
+def reduced_jobs(jobs, dag):
+    """Job definitions keeping only dependencies not implied by other ones, with the number of removed ones."""
+    reduced = dict()
+    removed = 0
+    for i, parents in enumerate(dag.reduced()):
+        job_name = dag.names[i]
+        job_definition = jobs[job_name]
+        if len(parents) == len(dag.parents[i]):
+            reduced[job_name] = job_definition
+            continue
+        removed += len(dag.parents[i]) - len(parents)
+        job_definition = {key: value for key, value in job_definition.items() if key != 'dependencies'}
+        if parents:
+            job_definition['dependencies'] = ','.join(dag.names[parent] for parent in parents)
+        reduced[job_name] = job_definition
+    return reduced, removed
+
+
+def build_project(name, properties, extra_properties, jobs, files, version, reduce_dependencies=False, report=None):
+    from azkaban import Project
 
-def build_project(name, properties, extra_properties, jobs, files, version):
     logger.info("Building workflow %s, version: %s.", name, version)
 
     project = Project(name, root=os.curdir, version=version)
-    project.properties = extra_properties
+    project.properties = dict(extra_properties)
     project.properties.update(properties)
 
-    dependencies = set()
+    dag = Dag(jobs).validate()
+    if reduce_dependencies:
+        jobs, removed = reduced_jobs(jobs, dag)
+        logger.info('Removed %d of %d dependencies implied by other ones.', removed, dag.edges)
+        if report is not None:
+            report.count('removed_dependencies', removed)
 
-    for job_name, job_definition in jobs.items():
+    if not isinstance(jobs, JobTable):
+        jobs = JobTable(jobs)
+    for job_name, record in jobs.items():
         logger.info('Adding job %s.', job_name)
-        job_dependencies = job_definition.get('dependencies')
-        if job_dependencies is not None:
-            dependencies.update([x.strip() for x in job_dependencies.split(',')])
-        project.add_job(job_name, Job(job_definition))
+        project.add_job(job_name, CompactJob(record))
 
-    for workflow in set(jobs.keys()).difference(dependencies):
+    for workflow in dag.roots:
         logger.info('Created workflow %s.', workflow)
 
     for file, target in files:
@@ -60,19 +168,76 @@ def build_project(name, properties, extra_properties, jobs, files, version):
     return project
 
 
-def process_project(session, name, definition, extra_properties, version, files):
+def check_unchanged(state, name, url, definition, extra_properties, files, force=False, files_digest=None,
+                    reduce_dependencies=False):
+    key = '%s@%s' % (name, url)
+    digest = content_hash(definition, extra_properties, files, files_digest=files_digest,
+                          reduce_dependencies=reduce_dependencies)
+    unchanged = not force and state.get(key) == digest
+    if unchanged:
+        logger.info('Project %s is unchanged since last deploy (%s), skipping.', name, digest[:12])
+    return key, digest, unchanged
+
+
+def process_project(session, name, definition, extra_properties, version, files, spool_size=None, state=None,
+                    force=False, deterministic=False, schedule_concurrency=DEFAULT_CONCURRENCY,
+                    prune_schedules=False, reduce_dependencies=False, files_digest=None, report=None):
+    report = report if report is not None else Report()
+    report.name, report.version = name, version
     properties = definition.get('properties', dict())
-    jobs = definition.get('jobs', dict())
+    jobs = definition_jobs(definition)
     description = definition.get('description', name)
     schedules = definition.get('schedule', dict())
 
-    project = build_project(name, properties, extra_properties, jobs, files, version)
+    with report.phase('files'):
+        files = list(files)
+    report.count('files', len(files))
+    report.count('file_bytes', sum(os.path.getsize(file) for file, _ in files))
+    report.count('jobs', len(jobs))
+
+    state_key = digest = None
+    if session is not None and state is not None:
+        with report.phase('hash'):
+            state_key, digest, unchanged = check_unchanged(state, name, session.url, definition, extra_properties,
+                                                           files, force=force, files_digest=files_digest,
+                                                           reduce_dependencies=reduce_dependencies)
+        if unchanged:
+            report.finish('unchanged')
+            return report
+
+    with report.phase('build'):
+        project = build_project(name, properties, extra_properties, jobs, files, version,
+                                reduce_dependencies=reduce_dependencies, report=report)
 
     zipfile = '%s.zip' % project.versioned_name
-    project.build(zipfile, overwrite=True)
-
-    if session is not None:
-        upload_project(session, name, zipfile, version, description)
-        for flow, schedule in schedules.items():
-            schedule_flow(session, name, flow, schedule)
-        os.remove(zipfile)
+    if session is None:
+        with report.phase('archive'):
+            write_archive(project, zipfile, deterministic=deterministic)
+        report.count('archive_bytes', os.path.getsize(zipfile))
+        report.finish('built')
+        return report
+
+    if spool_size is not None:
+        with report.phase('archive'):
+            archive = spool_archive(project, max_size=spool_size, deterministic=deterministic)
+        with archive:
+            report.count('archive_bytes', archive.seek(0, os.SEEK_END))
+            with report.phase('upload'):
+                upload_stream(session, name, archive, zipfile, version, description)
+    else:
+        with report.phase('archive'):
+            write_archive(project, zipfile, deterministic=deterministic)
+        report.count('archive_bytes', os.path.getsize(zipfile))
+        try:
+            with report.phase('upload'):
+                upload_project(session, name, zipfile, version, description)
+        finally:
+            os.remove(zipfile)
+
+    with report.phase('schedule'):
+        reconcile_schedules(session, name, schedules, concurrency=schedule_concurrency, prune=prune_schedules)
+
+    if state_key is not None:
+        state.set(state_key, digest)
+    report.finish('deployed')
+    return report
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+from tempfile import NamedTemporaryFile
+
+from workflow.jobs import json_default
+
+CHUNK_SIZE = 1024 * 1024
+
+_state_lock = threading.Lock()
+
+
+def _update_file(digest, path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+
+# definition keys which end up in the built archive, unlike e.g. `schedule` or `description`
+ARCHIVE_KEYS = ('properties', 'jobs', 'templates')
+
+
+def files_hash(files):
+    digest = hashlib.sha256()
+    for file, target in sorted(files, key=lambda x: x[1]):
+        if os.path.isdir(file):
+            continue
+        digest.update(b'\0%s\0%d\0' % (target.encode('utf-8'), os.path.getsize(file)))
+        _update_file(digest, file)
+    return digest.hexdigest()
+
+
+def content_hash(definition, extra_properties, files=(), files_digest=None, reduce_dependencies=False):
+    """Digest of a deploy's inputs; pass `files_digest` (from `files_hash`) to avoid reading the files again.
+
+    Build options changing the archive built from the same inputs are part of the digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([definition, extra_properties], sort_keys=True, default=json_default).encode('utf-8'))
+    digest.update((files_digest or files_hash(files)).encode('ascii'))
+    if reduce_dependencies:
+        digest.update(b'\0reduce_dependencies')
+    return digest.hexdigest()
+
+
+def archive_hash(definition, extra_properties, files=(), files_digest=None, reduce_dependencies=False):
+    """Digest of the inputs of the built archive only."""
+    definition = {key: definition[key] for key in ARCHIVE_KEYS if key in definition}
+    return content_hash(definition, extra_properties, files, files_digest=files_digest,
+                        reduce_dependencies=reduce_dependencies)
+
+
+class StateStore:
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return dict()
+
+    def get(self, key):
+        return self._load().get(key)
+
+    def set(self, key, value):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with _state_lock:
+            state = self._load()
+            state[key] = value
+            with NamedTemporaryFile('w', dir=directory, delete=False) as f:
+                json.dump(state, f, indent=2, sort_keys=True)
+            os.replace(f.name, self.path)
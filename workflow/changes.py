@@ -0,0 +1,67 @@
+import os
+import subprocess
+
+from workflow import logger
+from workflow.repository import find_git_dir, head_sha
+
+LAST_DEPLOY = 'last-deploy'
+
+
+def _git(worktree, *args):
+    output = subprocess.check_output(['git'] + list(args), cwd=worktree)
+    return [name for name in output.decode('utf-8').split('\0') if name]
+
+
+def changed_paths(worktree, revision):
+    names = _git(worktree, 'diff', '--name-only', '--no-renames', '-z', revision, '--')
+    names += _git(worktree, 'ls-files', '--others', '--exclude-standard', '-z')
+    return {os.path.join(worktree, name) for name in names}
+
+
+def touched(paths):
+    result = set()
+    for path in paths:
+        while path not in result:
+            result.add(path)
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+    return result
+
+
+def revision_key(worktree, url):
+    return 'revision:%s@%s' % (worktree, url)
+
+
+def affected_definitions(inputs, revision, state=None, url=None):
+    """Filter definitions to those whose inputs changed since `revision`.
+
+    `inputs` maps each definition to its input paths (definition, extra properties, files directory). `revision` is
+    a git revision or `LAST_DEPLOY`, which uses the revision recorded in `state` by the last successful deploy to
+    `url`; definitions in work trees without a recorded revision are all affected.
+    """
+    changes = dict()
+    affected = []
+    for definition, paths in inputs.items():
+        worktree, git_dir = find_git_dir(os.path.dirname(definition))
+        if git_dir is None:
+            affected.append(definition)
+            continue
+        worktree = os.path.realpath(worktree)
+        if worktree not in changes:
+            since = revision
+            if revision == LAST_DEPLOY:
+                since = state.get(revision_key(worktree, url)) if state is not None else None
+            changes[worktree] = touched(changed_paths(worktree, since)) if since is not None else None
+        if changes[worktree] is None or any(os.path.realpath(path) in changes[worktree] for path in paths):
+            affected.append(definition)
+    logger.info('%d of %d definitions changed since %s.', len(affected), len(inputs), revision)
+    return affected
+
+
+def record_deploy(state, definitions, url):
+    worktrees = {find_git_dir(os.path.dirname(definition)) for definition in definitions}
+    for worktree, git_dir in worktrees:
+        if git_dir is not None:
+            state.set(revision_key(os.path.realpath(worktree), url), head_sha(git_dir))
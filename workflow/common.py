@@ -1,9 +1,63 @@
+import hashlib
+import marshal
+import os
+
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 DIRTY_POSTFIX = 'dirty'
+DEFAULT_CACHE_DIR = os.path.join('~', '.cache', 'workflow')
+
+
+def _parse(content):
+    loaded = yaml.load(content, Loader=SafeLoader)
+    return loaded if loaded is not None else dict()
+
+
+def _owned(stat):
+    return not hasattr(os, 'getuid') or stat.st_uid == os.getuid()
+
+
+def yml_read(file, cache_dir=None):
+    if cache_dir is None:
+        with open(file, 'rb') as definition:
+            return _parse(definition)
+
+    path = os.path.abspath(file)
+    with open(path, 'rb') as definition:
+        stat = os.fstat(definition.fileno())
+        content = definition.read()
+    key = (path, stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).hexdigest())
 
+    cache_dir = os.path.expanduser(cache_dir)
+    cached = os.path.join(cache_dir, '%s.marshal' % hashlib.sha256(path.encode('utf-8')).hexdigest())
+    try:
+        with open(cached, 'rb') as f:
+            if _owned(os.fstat(f.fileno())):
+                cached_key, data = marshal.load(f)
+                if cached_key == key:
+                    return data
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
 
-def yml_read(file):
-    with open(file, 'r') as definition:
-        loaded = yaml.load(definition)
-        return loaded if loaded is not None else dict()
+    loaded = _parse(content)
+    try:
+        # marshal only handles plain values, so definitions holding e.g. timestamps are not cached
+        dumped = marshal.dumps((key, loaded))
+    except ValueError:
+        return loaded
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        if not _owned(os.stat(cache_dir)):
+            return loaded
+        temporary = '%s.%d' % (cached, os.getpid())
+        with open(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+            f.write(dumped)
+        os.replace(temporary, cached)
+    except OSError:
+        pass
+    return loaded
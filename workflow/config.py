@@ -1,12 +1,22 @@
 import os
-from argparse import ArgumentParser
-from glob import glob
+from argparse import ArgumentParser, ArgumentTypeError
 
-import git
-import yaml
-from azkaban.remote import Session
+from workflow.cache import StateStore, archive_hash, files_hash
+from workflow.common import DEFAULT_CACHE_DIR, DIRTY_POSTFIX, yml_read
+from workflow.files import git_files, walk_files
+from workflow.jobs import JobTable
+from workflow.metrics import Report
+from workflow.repository import find_git_dir, head_sha, is_dirty
+from workflow.retry import DEFAULT_ATTEMPTS, DEFAULT_BACKOFF, DEFAULT_TIMEOUT, RetryPolicy
+from workflow.schedules import DEFAULT_CONCURRENCY
+from workflow.templates import definition_jobs
 
-from workflow.common import DIRTY_POSTFIX, yml_read
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError('%s is not a positive integer' % value)
+    return number
 
 
 class Config:
@@ -14,39 +24,109 @@ class Config:
         self.parsed = self._parser.parse_args(args)
         self._definition = None
         self._extra_properties = None
+        self._version = None
+        self._jobs = None
+        self._files = None
+        self._files_digest = None
+        self.report = Report()
 
     @property
     def _parser(self):
         parser = ArgumentParser(description='Workflow builder and uploader.')
 
         parser.add_argument('--definition', '-d', required=True, help='Project definition yaml file.')
+        self._add_arguments(parser)
+        return parser
+
+    @staticmethod
+    def _add_arguments(parser, stream=True):
         parser.add_argument('--extra-properties', '-e', help='Extra properties to be included in project.')
         parser.add_argument('--files-to-upload', '-f',
                             help='Path to directory containing the files which should be uploaded.')
+        parser.add_argument('--files-from-git', choices=['tracked', 'untracked'],
+                            help='Collect files to upload from the git index instead of walking the directory; '
+                                 "'untracked' also includes untracked files which are not ignored.")
         parser.add_argument('--version', '-v',
                             help="Manual specification of deployed workflow version.")
+        parser.add_argument('--version-mode', choices=['git', 'content'], default='git',
+                            help="Derive the version from the git revision (default) or from a hash of the "
+                                 "project's build inputs.")
+        if stream:
+            parser.add_argument('--stream', '-s', action='store_true',
+                                help='Build the zip into a spooled buffer and upload it without writing it to cwd.')
+            parser.add_argument('--spool-size', type=int, default=64,
+                                help='Size in MB up to which the streamed zip is kept in memory (default 64).')
+        parser.add_argument('--deterministic', action='store_true',
+                            help='Build a reproducible zip (sorted members, fixed timestamps and permissions).')
+        parser.add_argument('--reduce-dependencies', action='store_true',
+                            help='Drop dependencies implied by other dependencies (transitive reduction).')
+        parser.add_argument('--state-file',
+                            help='Deploy state file; projects whose content hash matches the last deploy are skipped.')
+        parser.add_argument('--force', action='store_true',
+                            help='Build and upload even if the content hash matches the last deploy.')
+        parser.add_argument('--schedule-concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                            help='Number of schedule changes applied concurrently (default %d).' % DEFAULT_CONCURRENCY)
+        parser.add_argument('--prune-schedules', action='store_true',
+                            help='Unschedule flows of the project which are not in the definition schedule.')
+        Config._add_session_arguments(parser)
+        parser.add_argument('--report', metavar='PATH', help='Write phase timings and counters as JSON to PATH.')
+        Config._add_common_arguments(parser)
 
         azkaban = parser.add_mutually_exclusive_group(required=True)
         azkaban.add_argument('--azkaban-alias', '-a',
                              help='Alias for azkaban configuration (configured in ~/.azkabanrc)')
         azkaban.add_argument('--azkaban-url', '-u', help="Url of azkaban to connect.")
         azkaban.add_argument('--local', '-l ', action='store_true', help='Build zip instead of upload.')
-        return parser
+
+    @staticmethod
+    def _add_session_arguments(parser):
+        parser.add_argument('--retries', type=int, default=DEFAULT_ATTEMPTS,
+                            help='Maximum attempts of each Azkaban call on transient failures (default %d).'
+                                 % DEFAULT_ATTEMPTS)
+        parser.add_argument('--retry-backoff', type=float, default=DEFAULT_BACKOFF,
+                            help='Initial retry delay in seconds, doubled on every attempt (default %s).'
+                                 % DEFAULT_BACKOFF)
+        parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                            help='Timeout in seconds of each Azkaban request (default %s).' % DEFAULT_TIMEOUT)
+
+    @staticmethod
+    def _add_common_arguments(parser):
+        parser.add_argument('--profile', metavar='PATH',
+                            help='Run under cProfile and write the stats to PATH (readable with pstats/snakeviz).')
+        parser.add_argument('--trace-memory', action='store_true',
+                            help='Trace allocations with tracemalloc and report peak memory and top allocation sites.')
+        parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                            help='Directory caching parsed definitions (default %s).' % DEFAULT_CACHE_DIR)
+        parser.add_argument('--no-cache', action='store_true', help='Always parse definitions from scratch.')
 
     @property
     def definition(self):
         if self._definition is None:
-            with open(self.parsed.definition, 'r') as f:
-                self._definition = yaml.load(f)
+            with self.report.phase('definition'):
+                self._definition = yml_read(self.parsed.definition, cache_dir=self.cache_dir)
+                if isinstance(self._definition.get('jobs'), dict):
+                    self._definition['jobs'] = JobTable(self._definition['jobs'])
         return self._definition
 
+    @property
+    def jobs(self):
+        if self._jobs is None:
+            self._jobs = definition_jobs(self.definition)
+        return self._jobs
+
+    @property
+    def cache_dir(self):
+        if not self.parsed.no_cache:
+            return self.parsed.cache_dir
+
     @property
     def extra_properties(self):
         if self._extra_properties is None:
             if self.parsed.extra_properties is None:
                 self._extra_properties = dict()
             else:
-                self._extra_properties = yml_read(self.parsed.extra_properties)
+                with self.report.phase('extra_properties'):
+                    self._extra_properties = yml_read(self.parsed.extra_properties, cache_dir=self.cache_dir)
         return self._extra_properties
 
     @property
@@ -54,30 +134,135 @@ class Config:
         candidate = os.path.basename(self.parsed.definition.rstrip('/').split(os.path.sep)[-1])
         return self.definition.get('name') or candidate
 
-    def get_session(self):
+    def get_session(self, pool_size=1):
         if not self.parsed.local:
-            if self.parsed.azkaban_url is not None:
-                return Session(url=self.parsed.azkaban_url, verify=True)
-            return Session.from_alias(self.parsed.azkaban_alias)
+            return self._session(pool_size)
+
+    def _session(self, pool_size):
+        from azkaban.remote import Session
+        from workflow.session import PooledSession
+
+        if self.parsed.azkaban_url is not None:
+            session = Session(url=self.parsed.azkaban_url, verify=True)
+        else:
+            session = Session.from_alias(self.parsed.azkaban_alias)
+        retry_policy = RetryPolicy(attempts=self.parsed.retries, backoff=self.parsed.retry_backoff)
+        return PooledSession.wrap(session, pool_size=pool_size, timeout=self.parsed.timeout, retry_policy=retry_policy)
+
+    @property
+    def spool_size(self):
+        if self.parsed.stream:
+            return self.parsed.spool_size * 1024 * 1024
+
+    @property
+    def state(self):
+        if self.parsed.state_file is not None:
+            return StateStore(self.parsed.state_file)
+
+    @property
+    def deterministic(self):
+        return self.parsed.deterministic
+
+    @property
+    def reduce_dependencies(self):
+        return self.parsed.reduce_dependencies
+
+    @property
+    def schedule_concurrency(self):
+        return self.parsed.schedule_concurrency
+
+    @property
+    def prune_schedules(self):
+        return self.parsed.prune_schedules
+
+    @property
+    def force(self):
+        return self.parsed.force
+
+    @property
+    def inputs(self):
+        paths = [self.parsed.definition]
+        if self.parsed.extra_properties is not None:
+            paths.append(self.parsed.extra_properties)
+        if self.parsed.files_to_upload is not None:
+            paths.append(self.parsed.files_to_upload.strip().rstrip('/*'))
+        return paths
 
     @property
     def repo_revision(self):
-        try:
-            repo = git.Repo(path=self.parsed.definition, search_parent_directories=True)
-            sha = repo.head.object.hexsha[:8]
-            return sha if not repo.is_dirty() else '%s.%s' % (sha, DIRTY_POSTFIX)
-        except git.exc.InvalidGitRepositoryError as e:
-            pass
+        worktree, git_dir = find_git_dir(os.path.dirname(os.path.abspath(self.parsed.definition)))
+        if git_dir is None:
+            return None
+        sha = head_sha(git_dir)
+        if sha is None:
+            return None
+        sha = sha[:8]
+        return sha if not is_dirty(worktree, self.inputs) else '%s.%s' % (sha, DIRTY_POSTFIX)
+
+    @property
+    def content_revision(self):
+        return archive_hash(self.definition, self.extra_properties, files_digest=self.files_digest,
+                            reduce_dependencies=self.reduce_dependencies)[:8]
 
     @property
     def version(self):
-        return self.parsed.version \
-               or self.repo_revision \
-               or 'unversioned'
+        if self._version is None:
+            with self.report.phase('version'):
+                derived = None
+                if self.parsed.version is None:
+                    derived = self.content_revision if self.parsed.version_mode == 'content' else self.repo_revision
+                self._version = self.parsed.version or derived or 'unversioned'
+        return self._version
 
     @property
     def files(self):
-        if self.parsed.files_to_upload is not None:
-            path = self.parsed.files_to_upload.strip().rstrip('/*')
-            for file in glob(os.path.join(path, '**/*'), recursive=True):
-                yield file, file.replace(path, '.')
+        if self._files is None:
+            self._files = []
+            if self.parsed.files_to_upload is not None:
+                path = self.parsed.files_to_upload.strip().rstrip('/*')
+                with self.report.phase('files'):
+                    if self.parsed.files_from_git is not None:
+                        self._files = list(git_files(path, untracked=self.parsed.files_from_git == 'untracked'))
+                    else:
+                        self._files = list(walk_files(path))
+        return self._files
+
+    @property
+    def files_digest(self):
+        if self._files_digest is None:
+            files = self.files
+            with self.report.phase('hash'):
+                self._files_digest = files_hash(files)
+        return self._files_digest
+
+
+class DefinitionConfig(Config):
+    """Arguments of commands inspecting the job graph of a definition without building it."""
+    command = None
+    description = None
+
+    def __init__(self, args=None):
+        super().__init__(args)
+        self._dag = None
+
+    @property
+    def _parser(self):
+        parser = ArgumentParser(prog='python -m workflow %s' % self.command, description=self.description)
+
+        parser.add_argument('--definition', '-d', required=True, help='Project definition yaml file.')
+        self._add_command_arguments(parser)
+        self._add_common_arguments(parser)
+        return parser
+
+    @staticmethod
+    def _add_command_arguments(parser):
+        pass
+
+    @property
+    def dag(self):
+        from workflow.dag import Dag
+
+        if self._dag is None:
+            with self.report.phase('dag'):
+                self._dag = Dag(self.jobs).validate()
+        return self._dag
@@ -0,0 +1,146 @@
+from collections import deque
+
+
+class DagError(ValueError):
+    """Invalid job graph: dependencies on undefined jobs (`unknown`, a list of `(job, dependency)`) or a `cycle`."""
+
+    def __init__(self, message, unknown=(), cycle=()):
+        super().__init__(message)
+        self.unknown = list(unknown)
+        self.cycle = list(cycle)
+
+
+def split_dependencies(value):
+    if value is None:
+        return []
+    return [dependency.strip() for dependency in str(value).split(',') if dependency.strip()]
+
+
+class Dag:
+    """Index of the job graph of a definition, built once in O(V+E).
+
+    Jobs are numbered in definition order; `parents[i]` are the jobs job `i` depends on and `children[i]` the jobs
+    depending on it. Roots (jobs nothing depends on) are the flows Azkaban creates.
+    """
+
+    def __init__(self, jobs):
+        self.names = list(jobs)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.parents = [[] for _ in self.names]
+        self.children = [[] for _ in self.names]
+        self.unknown = []
+        for i, name in enumerate(self.names):
+            definition = jobs[name] or dict()
+            seen = set()
+            for dependency in split_dependencies(definition.get('dependencies')):
+                if dependency in seen:
+                    continue
+                seen.add(dependency)
+                parent = self.index.get(dependency)
+                if parent is None:
+                    self.unknown.append((name, dependency))
+                    continue
+                self.parents[i].append(parent)
+                self.children[parent].append(i)
+        self._order = None
+        self._cycle = None
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edges(self):
+        return sum(len(parents) for parents in self.parents)
+
+    @property
+    def roots(self):
+        return [self.names[i] for i, children in enumerate(self.children) if not children]
+
+    @property
+    def sources(self):
+        return [self.names[i] for i, parents in enumerate(self.parents) if not parents]
+
+    def dependencies(self, name):
+        return [self.names[i] for i in self.parents[self.index[name]]]
+
+    def dependents(self, name):
+        return [self.names[i] for i in self.children[self.index[name]]]
+
+    def _sort(self):
+        pending = [len(parents) for parents in self.parents]
+        ready = deque(i for i, count in enumerate(pending) if not count)
+        order = []
+        while ready:
+            i = ready.popleft()
+            order.append(i)
+            for child in self.children[i]:
+                pending[child] -= 1
+                if not pending[child]:
+                    ready.append(child)
+        self._order = order
+        if len(order) < len(self.names):
+            self._cycle = self._find_cycle(pending)
+
+    def _find_cycle(self, pending):
+        # Every job left unsorted has an unsorted dependency, so following those must revisit a job.
+        position = dict()
+        path = []
+        i = next(i for i, count in enumerate(pending) if count)
+        while i not in position:
+            position[i] = len(path)
+            path.append(i)
+            i = next(parent for parent in self.parents[i] if pending[parent])
+        return [self.names[j] for j in path[position[i]:]] + [self.names[i]]
+
+    @property
+    def order(self):
+        """Indices of jobs in topological order, dependencies first; partial when the graph has a cycle."""
+        if self._order is None:
+            self._sort()
+        return self._order
+
+    @property
+    def cycle(self):
+        """Job names of one dependency cycle, e.g. `['a', 'b', 'a']` for a depends on b depends on a."""
+        self.order
+        return self._cycle
+
+    def topological(self):
+        return [self.names[i] for i in self.order]
+
+    def reduced(self):
+        """Parents of every job without the redundant ones, i.e. those already reachable through another parent.
+
+        Jobs are visited in topological order with bit masks of their ancestors; a parent is redundant when it is in
+        the ancestors of a parent later in the order. A mask is released once its last dependent has been visited.
+        """
+        position = [0] * len(self.names)
+        for n, i in enumerate(self.order):
+            position[i] = n
+        pending = [len(children) for children in self.children]
+        ancestors = [0] * len(self.names)
+        reduced = [[] for _ in self.names]
+        for i in self.order:
+            mask = 0
+            for parent in sorted(self.parents[i], key=position.__getitem__, reverse=True):
+                if not mask >> parent & 1:
+                    reduced[i].append(parent)
+                    mask |= ancestors[parent]
+            for parent in self.parents[i]:
+                pending[parent] -= 1
+                if not pending[parent]:
+                    ancestors[parent] = 0
+            if pending[i]:
+                ancestors[i] = mask | 1 << i
+        return [sorted(parents) for parents in reduced]
+
+    def validate(self):
+        problems = []
+        if self.unknown:
+            problems.append('unknown dependencies %s' % ', '.join('%s -> %s' % item for item in self.unknown))
+        if self.cycle:
+            problems.append('dependency cycle %s' % ' -> '.join(self.cycle))
+        if problems:
+            raise DagError('Invalid job graph: %s.' % '; '.join(problems), unknown=self.unknown,
+                           cycle=self.cycle or ())
+        return self
@@ -0,0 +1,135 @@
+import os
+import re
+
+from workflow import logger
+
+IGNORE_FILE = '.workflowignore'
+
+
+def _translate(pattern):
+    i, n, regex = 0, len(pattern), ''
+    while i < n:
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif pattern[i] == '[' and pattern.find(']', i + 2) != -1:
+            end = pattern.find(']', i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            regex += '[%s]' % body.replace('\\', '\\\\')
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < n:
+            regex += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex
+
+
+class IgnoreRules:
+    def __init__(self, lines=()):
+        self.rules = []
+        for line in lines:
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            if not line.endswith('\\ '):
+                line = line.rstrip()
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            if '/' in line:
+                regex = '^%s$' % _translate(line.lstrip('/'))
+            else:
+                regex = '^(?:.*/)?%s$' % _translate(line)
+            self.rules.append((re.compile(regex), negate, dir_only))
+
+    @classmethod
+    def from_directory(cls, path):
+        try:
+            with open(os.path.join(path, IGNORE_FILE), 'r') as f:
+                return cls(f.readlines())
+        except FileNotFoundError:
+            return cls()
+
+    def ignored(self, relpath, is_dir=False):
+        result = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relpath):
+                result = not negate
+        return result
+
+    def ignored_path(self, relpath):
+        parts = relpath.split('/')
+        for i in range(1, len(parts)):
+            if self.ignored('/'.join(parts[:i]), is_dir=True):
+                return True
+        return self.ignored(relpath)
+
+
+def walk_files(root, rules=None):
+    """Files under `root` which are not ignored, following symlinked directories unless they were already walked."""
+    if rules is None:
+        rules = IgnoreRules.from_directory(root)
+    stat = os.stat(root)
+    visited = {(stat.st_dev, stat.st_ino)}
+    stack = [(root, '')]
+    while stack:
+        directory, prefix = stack.pop()
+        with os.scandir(directory) as entries:
+            files = []
+            for entry in entries:
+                relpath = prefix + entry.name
+                if entry.is_dir():
+                    if rules.ignored(relpath, is_dir=True):
+                        continue
+                    stat = entry.stat()
+                    if (stat.st_dev, stat.st_ino) in visited:
+                        logger.warning('Skipping %s, it links to a directory which is already included.', entry.path)
+                        continue
+                    visited.add((stat.st_dev, stat.st_ino))
+                    stack.append((entry.path, relpath + '/'))
+                elif entry.is_file() and not rules.ignored(relpath):
+                    files.append((entry.path, relpath))
+        yield from files
+
+
+def git_files(root, untracked=False, rules=None):
+    if rules is None:
+        rules = IgnoreRules.from_directory(root)
+    import git
+
+    repo = git.Repo(path=root, search_parent_directories=True)
+    arguments = ['-z', '--cached']
+    if untracked:
+        arguments += ['--others', '--exclude-standard']
+    listing = repo.git.ls_files(*arguments, '--', os.path.abspath(root))
+    worktree = repo.working_tree_dir
+    prefix = os.path.relpath(os.path.realpath(root), os.path.realpath(worktree)).replace(os.path.sep, '/')
+    prefix = '' if prefix == '.' else prefix + '/'
+    for name in sorted(set(listing.split('\0'))):
+        if not name.startswith(prefix) or name == prefix:
+            continue
+        path = os.path.join(worktree, name)
+        relpath = name[len(prefix):]
+        if os.path.isfile(path) and not rules.ignored_path(relpath):
+            yield path, relpath
@@ -0,0 +1,148 @@
+import json
+import sys
+
+from workflow import logger
+from workflow.config import DefinitionConfig
+from workflow.dag import DagError
+
+
+_popcount = int.bit_count if hasattr(int, 'bit_count') else lambda mask: bin(mask).count('1')
+
+
+def _bits(mask):
+    position = 0
+    for digit in bin(mask)[:1:-1]:
+        if digit == '1':
+            yield position
+        position += 1
+
+
+def selection_error(dag, flow=None, job=None):
+    """Why `flow` or `job` given on the command line cannot be selected, `None` when they can."""
+    for name in (flow, job):
+        if name is not None and name not in dag.index:
+            return 'Job %s is not defined.' % name
+    if flow is not None and dag.children[dag.index[flow]]:
+        return '%s is not a flow, jobs %s depend on it.' % (flow, ', '.join(dag.dependents(flow)))
+
+
+class FlowIndex:
+    """Flow membership of a validated `Dag`; a flow is a root job together with everything it transitively depends on.
+
+    Both directions are computed in a single pass in topological order, sharing the results of dependencies or
+    dependents instead of walking the graph once per flow: job to flows as bit masks over the roots, and flow sizes
+    from bit masks over the jobs, which are released once their last dependent has been processed.
+    """
+
+    def __init__(self, dag):
+        self.dag = dag
+        self.roots = [i for i, children in enumerate(dag.children) if not children]
+        self._masks = None
+        self._sizes = None
+
+    @property
+    def masks(self):
+        if self._masks is None:
+            position = {root: n for n, root in enumerate(self.roots)}
+            masks = [0] * len(self.dag)
+            for i in reversed(self.dag.order):
+                children = self.dag.children[i]
+                if not children:
+                    masks[i] = 1 << position[i]
+                elif len(children) == 1:
+                    masks[i] = masks[children[0]]
+                else:
+                    mask = 0
+                    for child in children:
+                        mask |= masks[child]
+                    masks[i] = mask
+            self._masks = masks
+        return self._masks
+
+    @property
+    def sizes(self):
+        """Number of jobs of every flow, by root name."""
+        if self._sizes is None:
+            pending = [len(children) for children in self.dag.children]
+            reach = [None] * len(self.dag)
+            sizes = dict()
+            for i in self.dag.order:
+                mask = 1 << i
+                for parent in self.dag.parents[i]:
+                    mask |= reach[parent]
+                    pending[parent] -= 1
+                    if not pending[parent]:
+                        reach[parent] = None
+                if pending[i]:
+                    reach[i] = mask
+                else:
+                    sizes[self.dag.names[i]] = _popcount(mask)
+            self._sizes = {self.dag.names[root]: sizes[self.dag.names[root]] for root in self.roots}
+        return self._sizes
+
+    def flows(self, job):
+        """Names of the flows `job` belongs to."""
+        return [self.dag.names[self.roots[n]] for n in _bits(self.masks[self.dag.index[job]])]
+
+    def members(self, flow):
+        """Names of the jobs of `flow`, in definition order."""
+        root = self.dag.index[flow]
+        if self.dag.children[root]:
+            raise KeyError('%s is not a flow, jobs %s depend on it.' % (flow, ', '.join(self.dag.dependents(flow))))
+        seen = {root}
+        stack = [root]
+        while stack:
+            for parent in self.dag.parents[stack.pop()]:
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return [self.dag.names[i] for i in sorted(seen)]
+
+    @property
+    def orphans(self):
+        """Jobs without dependencies which nothing depends on, each deployed as a flow of its own."""
+        return [self.dag.names[root] for root in self.roots if not self.dag.parents[root]]
+
+
+class FlowsConfig(DefinitionConfig):
+    command = 'flows'
+    description = 'Show the flows of a definition and the jobs belonging to them.'
+
+    @staticmethod
+    def _add_command_arguments(parser):
+        selection = parser.add_mutually_exclusive_group()
+        selection.add_argument('--flow', help='List the jobs of this flow.')
+        selection.add_argument('--job', help='List the flows this job belongs to.')
+        selection.add_argument('--orphans', action='store_true',
+                               help='List jobs without dependencies which nothing depends on.')
+        parser.add_argument('--json', action='store_true', help='Write JSON instead of plain lines.')
+
+
+def show_flows(c, out=sys.stdout):
+    try:
+        dag = c.dag
+    except DagError as e:
+        logger.error('%s', e)
+        return 1
+    error = selection_error(dag, flow=c.parsed.flow, job=c.parsed.job)
+    if error is not None:
+        logger.error('%s', error)
+        return 1
+    index = FlowIndex(dag)
+    if c.parsed.flow is not None:
+        content = index.members(c.parsed.flow)
+    elif c.parsed.job is not None:
+        content = index.flows(c.parsed.job)
+    elif c.parsed.orphans:
+        content = index.orphans
+    else:
+        content = dict(sorted(index.sizes.items(), key=lambda item: (-item[1], item[0])))
+
+    if c.parsed.json:
+        json.dump(content, out, indent=2)
+        out.write('\n')
+    elif isinstance(content, dict):
+        out.writelines('%s\t%d\n' % item for item in content.items())
+    else:
+        out.writelines('%s\n' % name for name in content)
+    return 0
@@ -0,0 +1,110 @@
+import json
+import sys
+from collections import deque
+from functools import partial
+
+from workflow import logger
+from workflow.config import DefinitionConfig
+from workflow.dag import DagError
+from workflow.flows import FlowIndex, selection_error
+
+FORMATS = ('dot', 'jsonl')
+
+
+def neighbourhood(dag, job, depth=None, direction='both'):
+    """Indices of jobs within `depth` dependency edges of `job`, following dependencies (`'up'`), dependents
+    (`'down'`) or both."""
+    start = dag.index[job]
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        i = queue.popleft()
+        if depth is not None and distance[i] >= depth:
+            continue
+        neighbours = []
+        if direction in ('up', 'both'):
+            neighbours.extend(dag.parents[i])
+        if direction in ('down', 'both'):
+            neighbours.extend(dag.children[i])
+        for neighbour in neighbours:
+            if neighbour not in distance:
+                distance[neighbour] = distance[i] + 1
+                queue.append(neighbour)
+    return set(distance)
+
+
+def _selected(dag, selection):
+    return range(len(dag)) if selection is None else sorted(selection)
+
+
+def dot_lines(dag, name, jobs, selection=None):
+    """DOT lines of the graph, edges pointing from a dependency to its dependents; flow roots are drawn doubled."""
+    quote = partial(json.dumps, ensure_ascii=False)
+    yield 'digraph %s {\n' % quote(name)
+    yield '  rankdir=LR;\n  node [shape=box];\n'
+    for i in _selected(dag, selection):
+        attributes = 'label=%s' % quote('%s\n%s' % (dag.names[i], (jobs[dag.names[i]] or dict()).get('type', '')))
+        if not dag.children[i]:
+            attributes += ', peripheries=2'
+        yield '  %s [%s];\n' % (quote(dag.names[i]), attributes)
+    for i in _selected(dag, selection):
+        for parent in dag.parents[i]:
+            if selection is None or parent in selection:
+                yield '  %s -> %s;\n' % (quote(dag.names[parent]), quote(dag.names[i]))
+    yield '}\n'
+
+
+def jsonl_lines(dag, name, jobs, selection=None):
+    """One JSON object per job: its name, type, dependencies inside the selection and whether it is a flow root."""
+    for i in _selected(dag, selection):
+        job = dag.names[i]
+        yield json.dumps({
+            'project': name,
+            'job': job,
+            'type': (jobs[job] or dict()).get('type'),
+            'dependencies': [dag.names[parent] for parent in dag.parents[i]
+                             if selection is None or parent in selection],
+            'root': not dag.children[i],
+        }, ensure_ascii=False) + '\n'
+
+
+class GraphConfig(DefinitionConfig):
+    command = 'graph'
+    description = 'Export the job graph of a definition as DOT or JSON lines.'
+
+    @staticmethod
+    def _add_command_arguments(parser):
+        parser.add_argument('--format', choices=FORMATS, default='dot', help='Output format (default dot).')
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument('--flow', help='Only export the jobs of this flow.')
+        scope.add_argument('--job', help='Only export the neighbourhood of this job.')
+        parser.add_argument('--depth', type=int, help='Number of dependency edges around --job (default unlimited).')
+        parser.add_argument('--direction', choices=('up', 'down', 'both'), default='both',
+                            help='Follow dependencies (up), dependents (down) or both from --job (default both).')
+        parser.add_argument('--output', '-o', help='File to write to instead of stdout.')
+
+
+def export_graph(c, out=sys.stdout):
+    try:
+        dag = c.dag
+    except DagError as e:
+        logger.error('%s', e)
+        return 1
+    selection = None
+    error = selection_error(dag, flow=c.parsed.flow, job=c.parsed.job)
+    if error is not None:
+        logger.error('%s', error)
+        return 1
+    if c.parsed.flow is not None:
+        selection = {dag.index[job] for job in FlowIndex(dag).members(c.parsed.flow)}
+    elif c.parsed.job is not None:
+        selection = neighbourhood(dag, c.parsed.job, depth=c.parsed.depth, direction=c.parsed.direction)
+
+    lines = (dot_lines if c.parsed.format == 'dot' else jsonl_lines)(dag, c.name, c.jobs, selection)
+    if c.parsed.output is None:
+        out.writelines(lines)
+    else:
+        with open(c.parsed.output, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+    logger.info('Exported %d jobs of %s.', len(dag) if selection is None else len(selection), c.name)
+    return 0
@@ -0,0 +1,97 @@
+from collections.abc import Mapping
+
+
+class Layout:
+    """Option names shared by all job records defining the same options in the same order."""
+    __slots__ = ('keys', 'index')
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.index = {key: i for i, key in enumerate(keys)}
+
+
+class JobRecord(Mapping):
+    """Read-only job definition: a shared `Layout` plus a tuple of option values."""
+    __slots__ = ('layout', 'values')
+
+    def __init__(self, layout, values):
+        self.layout = layout
+        self.values = values
+
+    def __getitem__(self, key):
+        return self.values[self.layout.index[key]]
+
+    def __iter__(self):
+        return iter(self.layout.keys)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return 'JobRecord(%r)' % dict(self)
+
+
+class JobTable(Mapping):
+    """Job definitions by name stored as `JobRecord`s.
+
+    Jobs with the same option names share one layout and equal strings are stored once, so thousands of similar jobs
+    cost a tuple each instead of a dict holding its own copies of every key and value.
+    """
+
+    def __init__(self, jobs=None):
+        self._records = dict()
+        layouts = dict()
+        strings = dict()
+        for name, job in (jobs or dict()).items():
+            if isinstance(job, JobRecord):
+                self._records[name] = job
+                continue
+            job = job or dict()
+            keys = tuple(strings.setdefault(key, key) for key in job)
+            layout = layouts.get(keys)
+            if layout is None:
+                layout = layouts[keys] = Layout(keys)
+            values = tuple(strings.setdefault(value, value) if isinstance(value, str) else value
+                           for value in job.values())
+            self._records[name] = JobRecord(layout, values)
+
+    def __getitem__(self, name):
+        return self._records[name]
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, name):
+        return name in self._records
+
+
+class CompactJob:
+    """Job of an `azkaban.Project` backed by a `JobRecord`; options are flattened only when the job file is written."""
+    __slots__ = ('record',)
+
+    def __init__(self, record):
+        self.record = record
+
+    @property
+    def options(self):
+        from azkaban.util import flatten
+
+        return flatten(dict(self.record))
+
+    def on_add(self, project, name, **kwargs):
+        pass
+
+    def build(self, path=None, header=None):
+        from azkaban.util import write_properties
+
+        write_properties(self.options, path=path, header=header)
+
+
+def json_default(value):
+    """`json` fallback serializing job tables and records like the dicts they were built from."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
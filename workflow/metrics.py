@@ -0,0 +1,55 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+class Report:
+    """Wall-clock time per deploy phase plus counters, written as JSON with `--report`."""
+
+    def __init__(self, name=None):
+        self.name = name
+        self.version = None
+        self.status = None
+        self.phases = dict()
+        self.counters = dict()
+        self._started = time.time()
+        self._finished = None
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def finish(self, status):
+        self.status = status
+        self._finished = time.time()
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'status': self.status,
+            'seconds': round((self._finished or time.time()) - self._started, 6),
+            'phases': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+
+    def summary(self):
+        report = self.as_dict()
+        phases = ', '.join('%s %.3fs' % item for item in report['phases'].items())
+        counters = ', '.join('%s %d' % item for item in report['counters'].items())
+        return '%s %s in %.3fs (%s; %s).' % (self.name, self.status, report['seconds'], phases, counters)
+
+    def write(self, path):
+        write_report(path, self.as_dict())
+
+
+def write_report(path, content):
+    with open(path, 'w') as f:
+        json.dump(content, f, indent=2, sort_keys=True)
@@ -0,0 +1,41 @@
+import cProfile
+import io
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+from workflow import logger
+
+TOP_ALLOCATIONS = 25
+
+
+@contextmanager
+def profiled(path=None, memory=False, top=TOP_ALLOCATIONS):
+    """Run the block under cProfile writing stats to `path`, and optionally under tracemalloc.
+
+    The memory report (peak usage and the `top` allocation sites) is logged and written to `<path>.memory.txt`.
+    """
+    profile = cProfile.Profile() if path is not None else None
+    if memory:
+        tracemalloc.start()
+    if profile is not None:
+        profile.enable()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(path)
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(top)
+            logger.info('Profile written to %s, top functions by cumulative time:\n%s', path, stream.getvalue())
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = ['Peak traced memory %.1f MB, current %.1f MB.' % (peak / 2 ** 20, current / 2 ** 20)]
+            lines += [str(stat) for stat in snapshot.statistics('lineno')[:top]]
+            logger.info('Memory usage:\n%s', '\n'.join(lines))
+            if path is not None:
+                with open('%s.memory.txt' % path, 'w') as f:
+                    f.write('\n'.join(lines) + '\n')
@@ -0,0 +1,69 @@
+import os
+import subprocess
+
+
+def find_git_dir(path):
+    current = os.path.abspath(path)
+    while True:
+        candidate = os.path.join(current, '.git')
+        if os.path.isdir(candidate):
+            return current, candidate
+        if os.path.isfile(candidate):
+            with open(candidate, 'r') as f:
+                content = f.read().strip()
+            if content.startswith('gitdir:'):
+                return current, os.path.normpath(os.path.join(current, content[len('gitdir:'):].strip()))
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None, None
+        current = parent
+
+
+def _common_dir(git_dir):
+    try:
+        with open(os.path.join(git_dir, 'commondir'), 'r') as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except FileNotFoundError:
+        return git_dir
+
+
+def _resolve_ref(git_dir, ref):
+    for directory in (git_dir, _common_dir(git_dir)):
+        try:
+            with open(os.path.join(directory, ref), 'r') as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            pass
+    try:
+        with open(os.path.join(_common_dir(git_dir), 'packed-refs'), 'r') as f:
+            for line in f:
+                if line.startswith(('#', '^')):
+                    continue
+                sha, _, name = line.strip().partition(' ')
+                if name == ref:
+                    return sha
+    except FileNotFoundError:
+        pass
+
+
+def head_sha(git_dir):
+    with open(os.path.join(git_dir, 'HEAD'), 'r') as f:
+        head = f.read().strip()
+    if head.startswith('ref:'):
+        return _resolve_ref(git_dir, head[len('ref:'):].strip())
+    return head
+
+
+def is_dirty(worktree, paths):
+    worktree = os.path.realpath(worktree)
+    scoped = []
+    for path in paths:
+        path = os.path.realpath(path)
+        if path == worktree or path.startswith(worktree + os.path.sep):
+            scoped.append(os.path.relpath(path, worktree))
+    if not scoped:
+        return False
+    output = subprocess.check_output(
+        ['git', 'status', '--porcelain', '-z', '--untracked-files=no', '--'] + scoped,
+        cwd=worktree, stderr=subprocess.DEVNULL)
+    return bool(output)
@@ -0,0 +1,54 @@
+import random
+import time
+
+from workflow import logger
+
+DEFAULT_ATTEMPTS = 5
+DEFAULT_BACKOFF = 1.0
+DEFAULT_TIMEOUT = 60.0
+
+
+def is_transient(error):
+    import requests
+    from azkaban.util import AzkabanError
+
+    if isinstance(error, AzkabanError):
+        message = str(error)
+        return isinstance(error.__cause__, requests.RequestException) \
+               or 'Unable to connect' in message or 'Azkaban server is unavailable' in message
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and (error.response.status_code >= 500 or error.response.status_code == 429)
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient Azkaban failures."""
+
+    def __init__(self, attempts=DEFAULT_ATTEMPTS, backoff=DEFAULT_BACKOFF, max_backoff=30.0):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def call(self, function, *args, **kwargs):
+        attempt = 1
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.attempts or not is_transient(e):
+                    raise
+                delay = self.delay(attempt)
+                logger.warning('%s failed (%s), retrying in %.1fs (attempt %d of %d).',
+                               getattr(function, '__name__', function), e, delay, attempt + 1, self.attempts)
+                time.sleep(delay)
+                attempt += 1
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+def retrying(session, function, *args, **kwargs):
+    return getattr(session, 'retry_policy', NO_RETRY).call(function, *args, **kwargs)
@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from workflow import logger
+from workflow.retry import retrying
+
+DEFAULT_CONCURRENCY = 4
+
+
+def _cron(item):
+    return item.get('cronExpression') or item.get('cron')
+
+
+def fetch_all_schedules(session):
+    """Current schedules of every project keyed by project and flow, fetched with a single `loadFlow` call."""
+    from azkaban.remote import _extract_json
+
+    res = retrying(session, lambda: _extract_json(
+        session._request(method='GET', endpoint='schedule', params={'ajax': 'loadFlow'})))
+    schedules = dict()
+    for item in res.get('items', []):
+        schedules.setdefault(item.get('projectname'), dict())[item['flowname']] = {
+            'scheduleId': item['scheduleid'], 'cronExpression': _cron(item)}
+    return schedules
+
+
+def fetch_schedules(session, name):
+    """Current schedules of project `name` keyed by flow."""
+    return fetch_all_schedules(session).get(name, dict())
+
+
+class ScheduleListing:
+    """Schedules of all projects on the server, shared between uploads and refetched after `ttl` seconds."""
+
+    def __init__(self, session, ttl=300):
+        self.session = session
+        self.ttl = ttl
+        self._schedules = None
+        self._fetched = None
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            if self._schedules is None or time.monotonic() - self._fetched > self.ttl:
+                self._schedules = fetch_all_schedules(self.session)
+                self._fetched = time.monotonic()
+            return dict(self._schedules.get(name, dict()))
+
+
+def _fetch_each(session, name, flows, concurrency):
+    from azkaban.util import AzkabanError
+
+    def fetch(flow):
+        try:
+            return flow, retrying(session, session.get_schedule, name, flow)
+        except AzkabanError:
+            return flow, None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return {flow: current for flow, current in executor.map(fetch, flows) if current is not None}
+
+
+def diff_schedules(current, desired):
+    add = [(flow, cron) for flow, cron in sorted(desired.items()) if flow not in current]
+    change = [(flow, current[flow], cron) for flow, cron in sorted(desired.items())
+              if flow in current and current[flow]['cronExpression'] != cron]
+    remove = [(flow, current[flow]) for flow in sorted(current) if flow not in desired]
+    return add, change, remove
+
+
+def unschedule(session, schedule_id):
+    from azkaban.remote import _extract_json
+
+    return retrying(session, lambda: _extract_json(
+        session._request(method='POST', endpoint='schedule',
+                         data={'action': 'removeSched', 'scheduleId': schedule_id})))
+
+
+def reconcile_schedules(session, name, desired, concurrency=DEFAULT_CONCURRENCY, prune=False, listing=None):
+    """Schedule the flows of `desired` (flow to cron) in project `name`; pass a `ScheduleListing` as `listing` to
+    reuse one listing of the server's schedules between projects."""
+    from azkaban.util import AzkabanError
+
+    if not desired and not prune:
+        # nothing to apply, so there is no reason to list every schedule on the server
+        return [], [], []
+    try:
+        current = listing.get(name) if listing is not None else fetch_schedules(session, name)
+        listed = True
+    except (AzkabanError, ValueError, KeyError) as e:
+        logger.warning('Listing schedules failed (%s), fetching them per flow.', e)
+        current = _fetch_each(session, name, list(desired), concurrency)
+        listed = False
+
+    add, change, remove = diff_schedules(current, desired)
+    tasks = []
+    for flow, cron in add:
+        logger.info('Scheduling %s@%s to %s', flow, name, cron)
+        tasks.append(lambda flow=flow, cron=cron: retrying(session, session.schedule_cron_workflow, name, flow, cron))
+    for flow, schedule, cron in change:
+        logger.info('Rescheduling %s @ %s from %s to %s.', flow, name, schedule['cronExpression'], cron)
+        # scheduling an already scheduled flow replaces its cron, so there is no unscheduled gap to recover from
+        tasks.append(lambda flow=flow, cron=cron: retrying(session, session.schedule_cron_workflow, name, flow, cron))
+    for flow, schedule in remove:
+        if prune and listed:
+            logger.info('Unscheduling %s@%s, it is no longer in the definition.', flow, name)
+            tasks.append(lambda schedule=schedule: unschedule(session, schedule['scheduleId']))
+        else:
+            logger.info('Flow %s@%s is scheduled but not in the definition.', flow, name)
+
+    if tasks:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(task) for task in tasks]:
+                future.result()
+    return add, change, remove
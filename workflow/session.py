@@ -0,0 +1,112 @@
+import threading
+
+import requests
+from azkaban.remote import Session
+from azkaban.util import AzkabanError
+
+from workflow.retry import DEFAULT_TIMEOUT, NO_RETRY
+
+
+class PooledSession(Session):
+    """Azkaban session sharing keep-alive connections and a single login between threads.
+
+    Requests time out after `timeout` seconds; `retry_policy` is applied by the builder around each Azkaban call.
+    """
+
+    def __init__(self, *args, pool_size=10, timeout=DEFAULT_TIMEOUT, retry_policy=NO_RETRY, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._setup(pool_size, timeout, retry_policy)
+
+    def _setup(self, pool_size, timeout, retry_policy):
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self._http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._http.mount('http://', adapter)
+        self._http.mount('https://', adapter)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def wrap(cls, session, pool_size=10, timeout=DEFAULT_TIMEOUT, retry_policy=NO_RETRY):
+        pooled = cls.__new__(cls)
+        pooled.__dict__.update(session.__dict__)
+        pooled._setup(pool_size, timeout, retry_policy)
+        return pooled
+
+    def _post(self, url, data):
+        try:
+            return self._http.post(url, data=data, verify=self.verify, timeout=self.timeout)
+        except requests.ConnectionError as err:
+            raise AzkabanError('Unable to connect to Azkaban server %r: %s', url, err) from err
+
+    def is_valid(self, response=None):
+        # the base class checks the session with a request outside the pool and without a timeout
+        if response is None and self.id:
+            response = self._post('%s/manager' % self.url, {'session.id': self.id})
+        return super().is_valid(response)
+
+    def _refresh(self, password=None):
+        stale = self.id
+        with self._lock:
+            if self.id is not None and self.id != stale:
+                return
+            self._login(password)
+
+    def _login(self, password=None):
+        """`Session._refresh` logging in through the pool, with the request timeout."""
+        from getpass import getpass
+
+        from azkaban.remote import _extract_json
+
+        attempts = self.attempts
+        password = password or self.password
+        while True:
+            password = password or getpass('Azkaban password for %s: ' % (self,))
+            try:
+                res = _extract_json(self._post(self.url, {'action': 'login', 'username': self.user,
+                                                          'password': password}))
+            except AzkabanError as err:
+                if 'Incorrect Login.' not in err.message:
+                    raise
+                self._logger.warning('Invalid login attempt.')
+                attempts -= 1
+                password = None
+                if attempts <= 0:
+                    raise AzkabanError('Too many unsuccessful login attempts. Aborting.')
+            else:
+                break
+        self.id = res['session.id']
+        if self.config:
+            if not self.config.parser.has_section('session_id'):
+                self.config.parser.add_section('session_id')
+            self.config.parser.set('session_id', str(self).replace(':', '.'), self.id)
+            self.config.save()
+        self._logger.info('Refreshed.')
+
+    def _request(self, method, endpoint, include_session='cookies', **kwargs):
+        full_url = '%s/%s' % (self.url, endpoint.lstrip('/'))
+
+        if not self.id:
+            self._refresh()
+
+        def _send_request():
+            if include_session == 'cookies':
+                kwargs.setdefault('cookies', {})['azkaban.browser.session.id'] = self.id
+            elif include_session == 'params':
+                kwargs.setdefault('data', {})['session.id'] = self.id
+            elif include_session:
+                raise ValueError('Invalid `include_session`: %r' % (include_session,))
+            kwargs.setdefault('timeout', self.timeout)
+            try:
+                return self._http.request(method, full_url, verify=self.verify, **kwargs)
+            except requests.ConnectionError as err:
+                raise AzkabanError('Unable to connect to Azkaban server %r: %s', full_url, err) from err
+
+        response = _send_request()
+        if not self.is_valid(response):
+            self._refresh()
+            response = _send_request()
+        if not self.is_valid(response):
+            raise AzkabanError('Azkaban server is unavailable.')
+        response.raise_for_status()
+        return response
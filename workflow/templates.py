@@ -0,0 +1,100 @@
+import re
+from collections.abc import Mapping
+from fnmatch import fnmatchcase
+from itertools import product
+
+from workflow.dag import split_dependencies
+
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+WILDCARD = re.compile(r'[*?\[]')
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def _render(value, parameters):
+    if isinstance(value, str):
+        return PLACEHOLDER.sub(lambda match: str(parameters.get(match.group(1), match.group(0))), value)
+    if isinstance(value, dict):
+        return {key: _render(item, parameters) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_render(item, parameters) for item in value]
+    return value
+
+
+def _rows(name, template):
+    matrix = template.get('matrix') or dict()
+    keys = list(matrix)
+    for key in keys:
+        if not isinstance(matrix[key], list):
+            raise TemplateError('Matrix parameter %s of template %s is not a list.' % (key, name))
+    excluded = template.get('exclude') or []
+    for values in product(*(matrix[key] for key in keys)):
+        parameters = dict(zip(keys, values))
+        if not any(all(parameters.get(key) == value for key, value in exclusion.items()) for exclusion in excluded):
+            yield values
+
+
+class ExpandedJobs(Mapping):
+    """Literal `jobs` of a definition followed by the jobs generated from its `templates`.
+
+    Only the generated names and their parameter values are kept; a job definition is rendered when it is looked up,
+    replacing `{parameter}` placeholders in the template job. Dependencies containing wildcards after rendering
+    (`load_*`) are replaced by all matching job names, in definition order.
+    """
+
+    def __init__(self, jobs, templates):
+        self.jobs = jobs or dict()
+        self.templates = templates
+        self._expanded = dict()
+        for template_name, template in templates.items():
+            if not template.get('name') or 'job' not in template:
+                raise TemplateError('Template %s needs a name pattern and a job.' % template_name)
+            keys = tuple(template.get('matrix') or dict())
+            for values in _rows(template_name, template):
+                name = _render(template['name'], dict(zip(keys, values)))
+                if name in self.jobs or name in self._expanded:
+                    raise TemplateError('Template %s generates job %s, which is already defined.'
+                                        % (template_name, name))
+                self._expanded[name] = (template_name, keys, values)
+        self._matches = dict()
+
+    def __len__(self):
+        return len(self.jobs) + len(self._expanded)
+
+    def __iter__(self):
+        yield from self.jobs
+        yield from self._expanded
+
+    def __contains__(self, name):
+        return name in self.jobs or name in self._expanded
+
+    def _match(self, pattern):
+        if pattern not in self._matches:
+            self._matches[pattern] = [name for name in self if fnmatchcase(name, pattern)] or [pattern]
+        return self._matches[pattern]
+
+    def _dependencies(self, value):
+        dependencies = []
+        for dependency in split_dependencies(value):
+            dependencies.extend(self._match(dependency) if WILDCARD.search(dependency) else [dependency])
+        return ','.join(dependencies)
+
+    def __getitem__(self, name):
+        if name in self.jobs:
+            job = self.jobs[name]
+        else:
+            template_name, keys, values = self._expanded[name]
+            job = _render(self.templates[template_name]['job'], dict(zip(keys, values))) or dict()
+        if job and job.get('dependencies') is not None and WILDCARD.search(str(job['dependencies'])):
+            job = dict(job, dependencies=self._dependencies(job['dependencies']))
+        return job
+
+
+def definition_jobs(definition):
+    """Jobs of `definition`, including those generated from its templates."""
+    templates = definition.get('templates')
+    if not templates:
+        return definition.get('jobs', dict())
+    return ExpandedJobs(definition.get('jobs'), templates)